@@ -0,0 +1,222 @@
+"""Benchmark of the eco2mix coordinator update cycle.
+
+Replays a scenario of polls against the fake ODRE server of fake_odre.py
+and measures, for each kind of poll, the latency, the CPU time, the peak
+memory allocated and the payload received from the API:
+
+    python benchmarks/bench_coordinator.py [--polls 40] [--output results.jsonl]
+
+Polls either follow a new publication, find no new record, hit an API
+outage or time out. With --output, the results are appended as a JSON
+line along with the git revision, and compared with the previous line of
+the file so regressions show up. Home Assistant must be installed.
+"""
+
+import argparse
+import asyncio
+from datetime import UTC, datetime
+import json
+from pathlib import Path
+import platform
+from statistics import median, quantiles
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from typing import Any
+
+import aiohttp
+from component import import_module
+from fake_odre import FakeOdreServer
+
+from homeassistant.core import HomeAssistant
+
+api = import_module("api")
+const = import_module("const")
+coordinator_module = import_module("coordinator")
+processing = import_module("processing")
+
+# Kinds of polls, repeated in this order
+SCENARIO = [
+    "publish",
+    "unchanged",
+    "publish",
+    "publish",
+    "outage",
+    "publish",
+    "unchanged",
+    "timeout",
+    "publish",
+    "publish",
+]
+
+# Metrics compared with the previous results
+COMPARED = ["latency_ms", "cpu_ms", "peak_kib", "payload_bytes"]
+
+
+async def run_polls(
+    args: argparse.Namespace, config_dir: str, trace: bool
+) -> list[dict[str, Any]]:
+    """Run the scenario and return the measures of each poll."""
+    hass = HomeAssistant(config_dir)
+    measures = []
+    async with (
+        FakeOdreServer() as server,
+        aiohttp.ClientSession() as session,
+    ):
+        client = api.Eco2mixApiClient(
+            session, server.base_url, timeout=args.timeout, cache_ttl=0
+        )
+        coordinator = coordinator_module.Eco2mixDataUpdateCoordinator(
+            hass,
+            client,
+            const.DEFAULT_SCAN_INTERVAL,
+            const.DEFAULT_MAX_SCAN_INTERVAL,
+            const.DEFAULT_STALE_AFTER,
+            0,
+            const.DEFAULT_EMISSION_FACTORS,
+            False,
+            [int(hours) for hours in const.DEFAULT_ROLLING_WINDOWS],
+            [],
+        )
+        if args.all_metrics:
+            coordinator.async_subscribe_metrics(processing.METRICS)
+        # First poll, fetching the records of the day
+        await coordinator.async_refresh()
+
+        for index in range(args.polls):
+            kind = SCENARIO[index % len(SCENARIO)]
+            if kind == "publish":
+                server.publish()
+            elif kind == "outage":
+                server.fail(503)
+            elif kind == "timeout":
+                server.stall(args.timeout * 2)
+
+            requests, payload = server.requests, server.bytes_sent
+            if trace:
+                tracemalloc.reset_peak()
+                memory = tracemalloc.get_traced_memory()[0]
+            cpu = time.process_time()
+            start = time.perf_counter()
+            await coordinator.async_refresh()
+            latency = time.perf_counter() - start
+            cpu = time.process_time() - cpu
+
+            measure = {
+                "kind": kind,
+                "latency_ms": latency * 1000,
+                "cpu_ms": cpu * 1000,
+                "requests": server.requests - requests,
+                "payload_bytes": server.bytes_sent - payload,
+            }
+            if trace:
+                measure["peak_kib"] = (
+                    tracemalloc.get_traced_memory()[1] - memory
+                ) / 1024
+            measures.append(measure)
+    return measures
+
+
+def summarize(measures: list[dict[str, Any]]) -> dict[str, dict[str, float]]:
+    """Return the median and 95th percentile of the measures by kind of poll."""
+    summary = {}
+    for kind in dict.fromkeys(measure["kind"] for measure in measures):
+        polls = [measure for measure in measures if measure["kind"] == kind]
+        summary[kind] = {"polls": len(polls)}
+        for name in ["latency_ms", "cpu_ms", "peak_kib", "payload_bytes", "requests"]:
+            values = [poll[name] for poll in polls if name in poll]
+            summary[kind][name] = median(values)
+            if name == "latency_ms" and len(values) > 1:
+                summary[kind]["latency_p95_ms"] = quantiles(values, n=20)[-1]
+    return summary
+
+
+def revision() -> str | None:
+    """Return the git revision of the tree, if any."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            cwd=Path(__file__).parent,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(path: Path, summary: dict[str, dict[str, float]]) -> None:
+    """Print the change of the summary since the last results of the file."""
+    if not path.exists() or not (lines := path.read_text().splitlines()):
+        return
+    previous = json.loads(lines[-1])
+    print(f"\nchange since {previous['revision']} ({previous['date']}):")
+    for kind, values in summary.items():
+        if kind not in previous["summary"]:
+            continue
+        changes = []
+        for name in COMPARED:
+            old = previous["summary"][kind].get(name)
+            if old:
+                changes.append(f"{name} {(values[name] - old) / old:+.1%}")
+        print(f"  {kind:<10} " + ", ".join(changes))
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--polls", type=int, default=40)
+    parser.add_argument(
+        "--timeout", type=float, default=0.2, help="API timeout, in seconds"
+    )
+    parser.add_argument(
+        "--all-metrics",
+        action="store_true",
+        help="subscribe to every metric, as if all sensors were enabled",
+    )
+    parser.add_argument("--output", type=Path, help="JSON lines file of results")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        # Allocations are traced in a separate run, tracing slows everything
+        measures = asyncio.run(run_polls(args, config_dir, trace=False))
+        tracemalloc.start()
+        traced = asyncio.run(run_polls(args, config_dir, trace=True))
+        tracemalloc.stop()
+    for measure, traced_measure in zip(measures, traced, strict=True):
+        measure["peak_kib"] = traced_measure["peak_kib"]
+    summary = summarize(measures)
+
+    print(f"polls: {args.polls}, all metrics: {args.all_metrics}")
+    print(
+        f"{'kind':<10} {'polls':>5} {'latency':>9} {'p95':>9} {'cpu':>9}"
+        f" {'peak':>10} {'payload':>9} {'requests':>8}"
+    )
+    for kind, values in summary.items():
+        print(
+            f"{kind:<10} {values['polls']:>5}"
+            f" {values['latency_ms']:>6.2f} ms"
+            f" {values.get('latency_p95_ms', values['latency_ms']):>6.2f} ms"
+            f" {values['cpu_ms']:>6.2f} ms"
+            f" {values['peak_kib']:>6.1f} KiB"
+            f" {values['payload_bytes']:>7.0f} B"
+            f" {values['requests']:>8.0f}"
+        )
+
+    if args.output:
+        compare(args.output, summary)
+        result = {
+            "date": datetime.now(UTC).isoformat(timespec="seconds"),
+            "revision": revision(),
+            "python": platform.python_version(),
+            "polls": args.polls,
+            "all_metrics": args.all_metrics,
+            "summary": summary,
+        }
+        with args.output.open("a") as file:
+            file.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Benchmark of the eco2mix record processing.
+
+Compares the batch processing of processing.py with the previous
+per-record implementation on synthetic API records:
+
+    python benchmarks/bench_processing.py [--records 10000] [--repeat 5]
+"""
+
+import argparse
+from datetime import UTC, datetime, timedelta
+import random
+import timeit
+from typing import Any
+
+from component import import_module
+
+const = import_module("const")
+processing = import_module("processing")
+
+
+def legacy_process_data(current_data: dict[str, Any]) -> dict[str, Any]:
+    """Process a record the way the coordinator did before batch processing."""
+    processed_data = {
+        "consumption": current_data["consommation"],
+        "nuclear": current_data["nucleaire"],
+        "wind": current_data["eolien"],
+        "solar": current_data["solaire"],
+        "hydraulic": current_data["hydraulique"],
+        "bioenergy": current_data["bioenergies"],
+        "gas": current_data["gaz"],
+        "coal": current_data["charbon"],
+        "fuel": current_data["fioul"],
+        "timestamp": datetime.fromisoformat(current_data["date_heure"]),
+        "pumping": abs(current_data["pompage"]) if current_data["pompage"] else 0,
+    }
+
+    total_production = sum(
+        processed_data[source]
+        for source in const.ALL_PRODUCTION_SOURCES
+        if processed_data.get(source) is not None
+    )
+    processed_data["total_production"] = total_production
+
+    exchanges = current_data.get("ech_physiques") or 0
+    processed_data["import"] = max(0, exchanges)
+    processed_data["export"] = abs(min(0, exchanges))
+
+    processed_data["renewable"] = sum(
+        processed_data[source]
+        for source in const.RENEWABLE_SOURCES
+        if processed_data.get(source) is not None
+    )
+    processed_data["low_carbon"] = sum(
+        processed_data[source]
+        for source in const.LOW_CARBON_SOURCES
+        if processed_data.get(source) is not None
+    )
+
+    if total_production > 0:
+        for source in const.ALL_PRODUCTION_SOURCES:
+            source_value_mw = (
+                processed_data[source] if processed_data.get(source) is not None else 0
+            )
+            processed_data[f"{source}_percentage"] = (
+                source_value_mw / total_production * 100
+            )
+        processed_data["renewable_percentage"] = (
+            processed_data["renewable"] / total_production * 100
+        )
+        processed_data["low_carbon_percentage"] = (
+            processed_data["low_carbon"] / total_production * 100
+        )
+
+    return processed_data
+
+
+def make_records(count: int) -> list[dict[str, Any]]:
+    """Return synthetic API records, one per quarter-hour."""
+    rng = random.Random(0)
+    start = datetime(2024, 1, 1, tzinfo=UTC)
+    return [
+        {
+            "date_heure": (start + timedelta(minutes=15 * index)).isoformat(),
+            "consommation": rng.randint(30000, 80000),
+            "nucleaire": rng.randint(25000, 55000),
+            "eolien": rng.randint(500, 15000),
+            "solaire": rng.randint(0, 12000),
+            "hydraulique": rng.randint(2000, 12000),
+            "bioenergies": rng.randint(800, 1200),
+            "gaz": rng.randint(500, 8000),
+            "charbon": rng.choice([0, 0, 0, 500, None]),
+            "fioul": rng.randint(50, 300),
+            "pompage": rng.choice([None, -rng.randint(100, 3000)]),
+            "ech_physiques": rng.randint(-15000, 5000),
+        }
+        for index in range(count)
+    ]
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    records = make_records(args.records)
+
+    expected = [legacy_process_data(record) for record in records]
+    processed = processing.process_records(records)
+    for old, new in zip(expected, processed, strict=True):
+        for key, value in old.items():
+            if new[key] is None and old.get(key.removesuffix("_percentage")) is None:
+                # Missing sources no longer get a percentage
+                continue
+            assert new[key] == value or abs(new[key] - value) < 1e-9, key
+
+    legacy = min(
+        timeit.repeat(
+            lambda: [legacy_process_data(record) for record in records],
+            number=1,
+            repeat=args.repeat,
+        )
+    )
+    batch = min(
+        timeit.repeat(
+            lambda: processing.process_records(records),
+            number=1,
+            repeat=args.repeat,
+        )
+    )
+    columns = min(
+        timeit.repeat(
+            lambda: processing.process_columns(records),
+            number=1,
+            repeat=args.repeat,
+        )
+    )
+
+    print(f"records:          {args.records}")
+    print(f"legacy per-row:   {legacy * 1000:8.2f} ms")
+    print(f"process_records:  {batch * 1000:8.2f} ms ({legacy / batch:.2f}x)")
+    print(f"process_columns:  {columns * 1000:8.2f} ms ({legacy / columns:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
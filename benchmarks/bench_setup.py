@@ -0,0 +1,138 @@
+"""Benchmark of the eco2mix import and setup times.
+
+Measures the time taken to import the integration modules, once the
+Home Assistant modules loaded before any integration are imported, and
+the time until the national data is served when setting up, with and
+without a snapshot persisted by a previous run:
+
+    python benchmarks/bench_setup.py [--repeat 5]
+
+The import is measured with python -X importtime in fresh interpreters,
+the setup against the fake ODRE server of fake_odre.py. Home Assistant
+must be installed.
+"""
+
+import argparse
+import asyncio
+from pathlib import Path
+from statistics import median
+import subprocess
+import sys
+import tempfile
+import time
+
+import aiohttp
+from component import import_module
+from fake_odre import FakeOdreServer
+
+from homeassistant.core import HomeAssistant
+
+api = import_module("api")
+const = import_module("const")
+coordinator_module = import_module("coordinator")
+
+# Modules loaded by Home Assistant before setting up the integration
+PRELOADED = [
+    "homeassistant.config_entries",
+    "homeassistant.components.sensor",
+    "homeassistant.helpers.update_coordinator",
+]
+INTEGRATION = "custom_components.eco2mix"
+PLATFORMS = [INTEGRATION, f"{INTEGRATION}.sensor", f"{INTEGRATION}.config_flow"]
+
+
+def imported_modules(modules: list[str]) -> dict[str, float]:
+    """Return the self import time of each module imported, in milliseconds."""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            "; ".join(f"import {module}" for module in modules),
+        ],
+        capture_output=True,
+        check=True,
+        cwd=Path(__file__).parents[1],
+        text=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, _, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(self_us) / 1000
+    return times
+
+
+def import_times() -> dict[str, float]:
+    """Return the self import time of the modules loaded by the integration."""
+    preloaded = imported_modules(PRELOADED)
+    return {
+        name: self_ms
+        for name, self_ms in imported_modules([*PRELOADED, *PLATFORMS]).items()
+        if name not in preloaded
+    }
+
+
+async def setup_time(config_dir: str, snapshot: bool) -> float:
+    """Return the time until the data is served, in milliseconds.
+
+    The snapshot left by the previous setup is served if asked to and
+    recent enough, else the data is fetched.
+    """
+    hass = HomeAssistant(config_dir)
+    async with (
+        FakeOdreServer() as server,
+        aiohttp.ClientSession() as session,
+    ):
+        client = api.Eco2mixApiClient(session, server.base_url, cache_ttl=0)
+        coordinator = coordinator_module.Eco2mixDataUpdateCoordinator(
+            hass,
+            client,
+            const.DEFAULT_SCAN_INTERVAL,
+            const.DEFAULT_MAX_SCAN_INTERVAL,
+            const.DEFAULT_STALE_AFTER,
+            0,
+            const.DEFAULT_EMISSION_FACTORS,
+            True,
+            [int(hours) for hours in const.DEFAULT_ROLLING_WINDOWS],
+            [],
+        )
+        start = time.perf_counter()
+        if not snapshot or not await coordinator.async_restore():
+            await coordinator.async_refresh()
+        elapsed = time.perf_counter() - start
+        assert coordinator.data is not None
+
+        # Persist the snapshot for the next setup
+        await coordinator._store.async_save(coordinator._data_to_save())
+        await coordinator.async_shutdown()
+    return elapsed * 1000
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    runs = [import_times() for _ in range(args.repeat)]
+    print(f"import:          {median(sum(run.values()) for run in runs):8.2f} ms")
+    print("slowest imports:")
+    slowest = sorted(runs[-1].items(), key=lambda item: item[1], reverse=True)
+    for name, self_ms in slowest[: args.top]:
+        print(f"  {name:<50} {self_ms:8.2f} ms")
+
+    cold, warm = [], []
+    with tempfile.TemporaryDirectory() as config_dir:
+        for _ in range(args.repeat):
+            cold.append(asyncio.run(setup_time(config_dir, snapshot=False)))
+            warm.append(asyncio.run(setup_time(config_dir, snapshot=True)))
+    print(f"setup, fetching: {median(cold):8.2f} ms")
+    print(f"setup, snapshot: {median(warm):8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+"""Import of the integration modules from the benchmarks.
+
+The modules are loaded without importing the integration package, whose
+__init__ requires a running Home Assistant.
+"""
+
+import importlib
+from pathlib import Path
+import sys
+import types
+
+COMPONENT_PATH = Path(__file__).parents[1] / "custom_components" / "eco2mix"
+
+_package = types.ModuleType("eco2mix")
+_package.__path__ = [str(COMPONENT_PATH)]
+sys.modules.setdefault("eco2mix", _package)
+
+
+def import_module(name: str) -> types.ModuleType:
+    """Import a module of the integration by name."""
+    return importlib.import_module(f"eco2mix.{name}")
@@ -0,0 +1,234 @@
+"""Local fake of the ODRE records and export endpoints replaying fixtures.
+
+The fixture records of a dataset are shifted so the published ones end at
+the current quarter-hour, then published one interval at a time like the
+real-time dataset: the records not published yet are served with their
+forecasts only, their consumption and production being null. The server
+can also be told to fail or to stall the next requests, to replay API
+outages and timeouts.
+
+    async with FakeOdreServer() as server:
+        client = Eco2mixApiClient(session, server.base_url)
+        server.publish()
+        server.fail(503)
+        server.stall(5)
+
+The server understands the subset of the ODSQL queries sent by the
+integration and answers any other query with a 400 error, so a query
+change doesn't go unnoticed.
+"""
+
+import asyncio
+from datetime import UTC, datetime
+import json
+import operator
+from pathlib import Path
+import re
+from typing import Any
+from zoneinfo import ZoneInfo
+
+from aiohttp import web
+
+FIXTURES_PATH = Path(__file__).parent / "fixtures"
+PARIS = ZoneInfo("Europe/Paris")
+
+# Fields only known once an interval is published
+FORECAST_FIELDS = {"date_heure", "code_insee_region", "prevision_j", "prevision_j1"}
+
+_DATE_CONDITION = re.compile(r"date_heure\s*(>=|>|<=|<)\s*date'([^']+)'")
+_DATE_COMPARISONS = {
+    ">=": operator.ge,
+    ">": operator.gt,
+    "<=": operator.le,
+    "<": operator.lt,
+}
+_NOT_NULL_CONDITION = re.compile(r"\(?(\w+) is not null(?: or (\w+) is not null\))?")
+_REGION_CONDITION = re.compile(r"code_insee_region = '(\w+)'")
+
+
+class FakeOdreServer:
+    """Fake ODRE server replaying the fixture records of the datasets."""
+
+    def __init__(self, published: int = 48, fixtures_path: Path = FIXTURES_PATH):
+        """Initialize with the number of records published at start."""
+        self._records: dict[str, list[dict[str, Any]]] = {}
+        self._published = published
+        for path in sorted(fixtures_path.glob("*.json")):
+            fixture = json.loads(path.read_text())
+            results = fixture["results"]
+            # Records without a quarter-hour timestamp are served as recorded
+            if results and "date_heure" in results[0]:
+                results = self._shift(results)
+            self._records[fixture["dataset"]] = results
+        self._failures: list[int] = []
+        self._stalls: list[float] = []
+        self._runner: web.AppRunner | None = None
+        self.base_url = ""
+        self.requests = 0
+        self.bytes_sent = 0
+
+    def _shift(self, records: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Shift the records so the published ones end at this quarter-hour."""
+        now = datetime.now(UTC)
+        now = now.replace(minute=now.minute - now.minute % 15, second=0, microsecond=0)
+        latest = max(
+            datetime.fromisoformat(record["date_heure"])
+            for record in records[: self._published]
+        )
+        shift = now - latest
+        return sorted(
+            (
+                {
+                    **record,
+                    "date_heure": (
+                        datetime.fromisoformat(record["date_heure"]) + shift
+                    ).isoformat(),
+                }
+                for record in records
+            ),
+            key=lambda record: record["date_heure"],
+        )
+
+    async def __aenter__(self) -> "FakeOdreServer":
+        """Start the server on a free local port."""
+        app = web.Application()
+        app.router.add_get(
+            "/api/explore/v2.1/catalog/datasets/{dataset}/records", self._handle
+        )
+        app.router.add_get(
+            "/api/explore/v2.1/catalog/datasets/{dataset}/exports/json",
+            self._handle,
+        )
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.base_url = f"http://127.0.0.1:{port}/api/explore/v2.1"
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        """Stop the server."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def publish(self, count: int = 1) -> None:
+        """Publish the next intervals of the fixtures."""
+        self._published += count
+
+    def fail(self, status: int = 503, count: int = 1) -> None:
+        """Answer the next requests with an error status."""
+        self._failures.extend([status] * count)
+
+    def stall(self, delay: float, count: int = 1) -> None:
+        """Delay the answer of the next requests."""
+        self._stalls.extend([delay] * count)
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        """Answer a records request."""
+        self.requests += 1
+        if self._stalls:
+            await asyncio.sleep(self._stalls.pop(0))
+        if self._failures:
+            return web.json_response(
+                {"error_code": "ServiceUnavailable"}, status=self._failures.pop(0)
+            )
+        if (records := self._records.get(request.match_info["dataset"])) is None:
+            return web.json_response({"error_code": "NotFound"}, status=404)
+
+        try:
+            results = self._query(
+                records, request.query, request.path.endswith("/exports/json")
+            )
+        except ValueError as err:
+            return web.json_response(
+                {"error_code": "ODSQLError", "message": str(err)}, status=400
+            )
+
+        if request.path.endswith("/exports/json"):
+            body = json.dumps(results)
+        else:
+            body = json.dumps({"total_count": len(results), "results": results})
+        self.bytes_sent += len(body)
+        return web.Response(text=body, content_type="application/json")
+
+    def _query(
+        self, records: list[dict[str, Any]], query: Any, export: bool
+    ) -> list[dict[str, Any]]:
+        """Return the records matching the query parameters."""
+        records = [
+            record if index < self._published else self._unpublished(record)
+            for index, record in enumerate(records)
+        ]
+
+        if where := query.get("where"):
+            for condition in re.split(r" and (?![^(]*\))", where):
+                records = self._filter(records, condition.strip())
+
+        if refine := query.get("refine"):
+            field, _, day = refine.partition(":")
+            if field != "date_heure":
+                raise ValueError(f"Unsupported refine: {refine}")
+            records = [
+                record
+                for record in records
+                if datetime.fromisoformat(record["date_heure"])
+                .astimezone(PARIS)
+                .strftime("%Y/%m/%d")
+                == day
+            ]
+
+        order_by = query.get("order_by", "date_heure asc")
+        if order_by not in ("date_heure asc", "date_heure desc"):
+            raise ValueError(f"Unsupported order_by: {order_by}")
+        records.sort(
+            key=lambda record: record["date_heure"],
+            reverse=order_by.endswith("desc"),
+        )
+
+        # Exports are not paginated
+        limit = int(query.get("limit", -1 if export else 10))
+        if limit > 100 and not export:
+            raise ValueError("Limit must be at most 100")
+        offset = int(query.get("offset", 0))
+        records = records[offset : offset + limit if limit >= 0 else None]
+
+        if select := query.get("select"):
+            fields = select.split(",")
+            records = [
+                {field: record.get(field) for field in fields} for record in records
+            ]
+        return records
+
+    @staticmethod
+    def _unpublished(record: dict[str, Any]) -> dict[str, Any]:
+        """Return a record not published yet, with its forecasts only."""
+        return {
+            field: value if field in FORECAST_FIELDS else None
+            for field, value in record.items()
+        }
+
+    @staticmethod
+    def _filter(records: list[dict[str, Any]], condition: str) -> list[dict[str, Any]]:
+        """Return the records matching a where condition."""
+        if match := _DATE_CONDITION.fullmatch(condition):
+            comparison, value = match.groups()
+            compare = _DATE_COMPARISONS[comparison]
+            bound = datetime.fromisoformat(value)
+            return [
+                record
+                for record in records
+                if compare(datetime.fromisoformat(record["date_heure"]), bound)
+            ]
+        if match := _NOT_NULL_CONDITION.fullmatch(condition):
+            fields = [field for field in match.groups() if field]
+            return [
+                record
+                for record in records
+                if any(record.get(field) is not None for field in fields)
+            ]
+        if regions := _REGION_CONDITION.findall(condition):
+            return [
+                record for record in records if record["code_insee_region"] in regions
+            ]
+        raise ValueError(f"Unsupported condition: {condition}")
@@ -0,0 +1,85 @@
+"""Record a day of an ODRE dataset as a fixture.
+
+The records are fetched from the ODRE API and saved in the fixtures
+replayed by fake_odre.py. By default a day of the national real-time
+dataset is recorded with the fields the integration queries; any other
+dataset is recorded with all its fields, for example to check its
+fields before the integration queries it:
+
+    python benchmarks/record_fixture.py [--day 2024-06-12]
+    python benchmarks/record_fixture.py --dataset <id> --date-field <field>
+"""
+
+import argparse
+import asyncio
+from datetime import date, datetime, time, timedelta
+import json
+from typing import Any
+from zoneinfo import ZoneInfo
+
+import aiohttp
+from component import import_module
+from fake_odre import FIXTURES_PATH
+
+api = import_module("api")
+const = import_module("const")
+
+
+async def record(day: date, dataset: str, date_field: str) -> list[dict]:
+    """Return the records of a local day, oldest first."""
+    start = datetime.combine(day, time(), ZoneInfo("Europe/Paris"))
+    params: dict[str, Any] = {
+        "where": (
+            f"{date_field} >= date'{start.isoformat()}'"
+            f" and {date_field} < date'{(start + timedelta(days=1)).isoformat()}'"
+        ),
+        "order_by": f"{date_field} asc",
+        "limit": const.API_PAGE_SIZE,
+        "offset": 0,
+    }
+    if dataset == const.NATIONAL_DATASET:
+        params["select"] = ",".join(
+            dict.fromkeys([*const.NATIONAL_FIELDS, *const.FORECAST_FIELDS])
+        )
+    records = []
+    async with aiohttp.ClientSession() as session:
+        client = api.Eco2mixApiClient(session)
+        while True:
+            results = await client.async_get_records(dataset, params)
+            records.extend(results)
+            if len(results) < const.API_PAGE_SIZE:
+                return records
+            params["offset"] += const.API_PAGE_SIZE
+
+
+def main() -> None:
+    """Record the fixture."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--day",
+        type=date.fromisoformat,
+        default=date.today() - timedelta(days=1),
+        help="local day to record, yesterday by default",
+    )
+    parser.add_argument(
+        "--dataset",
+        default=const.NATIONAL_DATASET,
+        help="dataset to record, the national real-time dataset by default",
+    )
+    parser.add_argument(
+        "--date-field",
+        default="date_heure",
+        help="date field of the dataset to select the day with",
+    )
+    args = parser.parse_args()
+
+    records = asyncio.run(record(args.day, args.dataset, args.date_field))
+    path = FIXTURES_PATH / f"{args.dataset}.json"
+    path.write_text(
+        json.dumps({"dataset": args.dataset, "results": records}, indent=1) + "\n"
+    )
+    print(f"Recorded {len(records)} records in {path}")
+
+
+if __name__ == "__main__":
+    main()
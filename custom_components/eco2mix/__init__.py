@@ -1,43 +1,141 @@
 """The éCO2mix integration."""
 
-import asyncio
+from datetime import timedelta
 import logging
+import time
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.const import Platform
 from homeassistant.const import UnitOfTime
 
-from .coordinator import Eco2mixDataUpdateCoordinator
-from .const import DOMAIN, DEFAULT_SCAN_INTERVAL
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .api import Eco2mixApiClient
+from .coordinator import (
+    Eco2mixData,
+    Eco2mixDataUpdateCoordinator,
+    Eco2mixRegionalCoordinator,
+)
+from .services import async_setup_services
+from .thresholds import thresholds_from_options
+from .const import (
+    CONF_BACKFILL_DAYS,
+    CONF_EMISSION_FACTORS,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_PERSIST_HISTORY,
+    CONF_REGIONS,
+    CONF_ROLLING_WINDOWS,
+    CONF_STALE_AFTER,
+    CONF_THRESHOLDS,
+    DATA_CLIENT,
+    DEFAULT_BACKFILL_DAYS,
+    DEFAULT_EMISSION_FACTORS,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_PERSIST_HISTORY,
+    DEFAULT_ROLLING_WINDOWS,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_STALE_AFTER,
+    DOMAIN,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS: list[Platform] = [Platform.SENSOR]
+PLATFORMS: list[Platform] = [Platform.BINARY_SENSOR, Platform.SENSOR]
 
-type Eco2mixConfigEntry = ConfigEntry[Eco2mixDataUpdateCoordinator]
+type Eco2mixConfigEntry = ConfigEntry[Eco2mixData]
 
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the éCO2mix component."""
     hass.data.setdefault(DOMAIN, {})
+    async_setup_services(hass)
     return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up éCO2mix from a config entry."""
-    coordinator = Eco2mixDataUpdateCoordinator(hass, DEFAULT_SCAN_INTERVAL)
-
-    try:
+    started = time.monotonic()
+    # The client and its cache are shared by all entries and reloads
+    if (client := hass.data[DOMAIN].get(DATA_CLIENT)) is None:
+        client = hass.data[DOMAIN][DATA_CLIENT] = Eco2mixApiClient(
+            async_get_clientsession(hass)
+        )
+    max_scan_interval = entry.options.get(
+        CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL
+    )
+    emission_factors = {
+        **DEFAULT_EMISSION_FACTORS,
+        **entry.options.get(CONF_EMISSION_FACTORS, {}),
+    }
+
+    coordinator = Eco2mixDataUpdateCoordinator(
+        hass,
+        client,
+        DEFAULT_SCAN_INTERVAL,
+        max_scan_interval,
+        entry.options.get(CONF_STALE_AFTER, DEFAULT_STALE_AFTER),
+        entry.options.get(CONF_BACKFILL_DAYS, DEFAULT_BACKFILL_DAYS),
+        emission_factors,
+        entry.options.get(CONF_PERSIST_HISTORY, DEFAULT_PERSIST_HISTORY),
+        [
+            int(hours)
+            for hours in entry.options.get(
+                CONF_ROLLING_WINDOWS, DEFAULT_ROLLING_WINDOWS
+            )
+        ],
+        thresholds_from_options(entry.options.get(CONF_THRESHOLDS, {})),
+    )
+
+    if not await coordinator.async_restore():
+        # Without a recent snapshot, the entities wait for the data. The
+        # setup is retried if it can't be fetched, keeping the snapshot.
         await coordinator.async_config_entry_first_refresh()
-    except Exception:
-        _LOGGER.error("Error fetching initial data")
-        return False
-
-    entry.runtime_data = coordinator
+    elif coordinator.refresh_due:
+        # Entities come up with the snapshot, refreshed in the background
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), "eco2mix first refresh"
+        )
+
+    regional = None
+    if regions := entry.options.get(CONF_REGIONS):
+        regional = Eco2mixRegionalCoordinator(
+            hass,
+            client,
+            regions,
+            DEFAULT_SCAN_INTERVAL,
+            max_scan_interval,
+            emission_factors,
+        )
+
+    entry.runtime_data = Eco2mixData(coordinator, regional)
+
+    if regional is not None:
+        # Regional sensors don't depend on this first refresh succeeding
+        entry.async_create_background_task(
+            hass, regional.async_refresh(), "eco2mix regional refresh"
+        )
+
+    # The forecast and the backfill are polled at their own pace as long as
+    # the entry is loaded, the forecast being used by the services too
+    forecast = coordinator.forecast_coordinator
+    entry.async_on_unload(forecast.async_add_listener(lambda: None))
+    entry.async_create_background_task(
+        hass, forecast.async_refresh(), "eco2mix forecast refresh"
+    )
+    if (history := coordinator.history_coordinator) is not None:
+        entry.async_on_unload(
+            history.async_add_listener(coordinator.async_handle_backfill)
+        )
+        entry.async_create_background_task(
+            hass, history.async_refresh(), "eco2mix statistics backfill"
+        )
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    entry.runtime_data.setup_duration = timedelta(seconds=time.monotonic() - started)
+    _LOGGER.debug("Set up in %s", entry.runtime_data.setup_duration)
+
     entry.async_on_unload(entry.add_update_listener(update_listener))
 
     return True
@@ -45,15 +143,9 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
-
-    if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
-
-    return unload_ok
+    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
 
 async def update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Update listener."""
-    await async_unload_entry(hass, entry)
-    await async_setup_entry(hass, entry)
+    await hass.config_entries.async_reload(entry.entry_id)
@@ -0,0 +1,281 @@
+"""Async client for the ODRE open data API."""
+
+import asyncio
+from bisect import bisect_left
+import codecs
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+import json
+import time
+from typing import Any
+
+import aiohttp
+
+from .circuit import STATE_HALF_OPEN, CircuitBreaker
+from .const import API_BASE_URL, API_CACHE_TTL, API_LATENCY_BUCKETS, API_TIMEOUT
+
+
+class Eco2mixApiError(Exception):
+    """Error raised when the ODRE API request fails."""
+
+
+class Eco2mixCircuitOpenError(Eco2mixApiError):
+    """Error raised when requests are paused after repeated failures."""
+
+
+@dataclass
+class Eco2mixApiStats:
+    """Statistics of the requests made by the client.
+
+    The latency histogram counts the requests by API_LATENCY_BUCKETS upper
+    bound, the last bucket counting the slower requests.
+    """
+
+    requests: int = 0
+    failures: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    bytes_received: int = 0
+    records_received: int = 0
+    last_latency: float | None = None
+    latency_histogram: list[int] = field(
+        default_factory=lambda: [0] * (len(API_LATENCY_BUCKETS) + 1)
+    )
+
+    @property
+    def cache_hit_rate(self) -> float | None:
+        """Return the percentage of the queries answered without a request."""
+        queries = self.cache_hits + self.cache_misses
+        return self.cache_hits / queries * 100 if queries else None
+
+    def record_latency(self, latency: float) -> None:
+        """Count a request in the latency histogram."""
+        self.last_latency = latency
+        self.latency_histogram[bisect_left(API_LATENCY_BUCKETS, latency)] += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics, with the histogram by bucket upper bound."""
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_hit_rate": self.cache_hit_rate,
+            "bytes_received": self.bytes_received,
+            "records_received": self.records_received,
+            "last_latency": self.last_latency,
+            "latency_histogram": dict(
+                zip(
+                    [*map(str, API_LATENCY_BUCKETS), "inf"],
+                    self.latency_histogram,
+                    strict=True,
+                )
+            ),
+        }
+
+
+async def _iter_json_array(
+    stream: aiohttp.StreamReader, stats: Eco2mixApiStats
+) -> AsyncIterator[dict[str, Any]]:
+    """Yield the objects of a JSON array as the stream is received.
+
+    Only the objects not decoded yet are kept, so the memory used doesn't
+    depend on the size of the array.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    position = 0
+    started = False
+    async for chunk in stream.iter_any():
+        stats.bytes_received += len(chunk)
+        buffer = buffer[position:] + text.decode(chunk)
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position == len(buffer):
+                break
+            if not started:
+                if buffer[position] != "[":
+                    raise ValueError("Expected a JSON array")
+                started = True
+                position += 1
+                continue
+            if buffer[position] == "]":
+                return
+            if buffer[position] != "{":
+                raise ValueError("Expected a JSON object")
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # The object isn't fully received yet
+                break
+            yield item
+    raise ValueError("Truncated JSON array")
+
+
+class Eco2mixApiClient:
+    """Client fetching dataset records from the ODRE API.
+
+    The client reuses the aiohttp session it is given, so connections to
+    the API are kept alive between polls instead of being re-established.
+    Non-empty results are cached by dataset and query for a short time, and
+    callers asking for a query already in flight wait for the same request.
+    The returned records are shared between callers and must not be
+    modified. Request statistics are kept in stats.
+
+    Requests go through a circuit breaker: after repeated failures, queries
+    that can't be answered from the cache fail without a request until the
+    API answers a probe again.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        base_url: str = API_BASE_URL,
+        timeout: float = API_TIMEOUT,
+        cache_ttl: float = API_CACHE_TTL,
+    ) -> None:
+        """Initialize."""
+        self._session = session
+        self._base_url = base_url
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._cache_ttl = cache_ttl
+        self._cache: dict[tuple, tuple[float, list[dict[str, Any]]]] = {}
+        self._in_flight: dict[tuple, asyncio.Future[list[dict[str, Any]]]] = {}
+        self.stats = Eco2mixApiStats()
+        self.breaker = CircuitBreaker()
+
+    async def async_get_records(
+        self, dataset: str, params: dict[str, Any]
+    ) -> list[dict[str, Any]]:
+        """Return the records of a dataset matching the query parameters."""
+        key = (
+            dataset,
+            tuple(sorted((name, str(value)) for name, value in params.items())),
+        )
+
+        now = time.monotonic()
+        if (cached := self._cache.get(key)) is not None and cached[0] > now:
+            self.stats.cache_hits += 1
+            return cached[1]
+
+        if (request := self._in_flight.get(key)) is not None:
+            self.stats.cache_hits += 1
+        else:
+            if not self.breaker.allow_request(now):
+                raise Eco2mixCircuitOpenError("API requests paused after failures")
+            probe = self.breaker.state(now) == STATE_HALF_OPEN
+            self.stats.cache_misses += 1
+            request = asyncio.ensure_future(
+                self._async_request(key, dataset, dict(params), probe)
+            )
+            self._in_flight[key] = request
+            request.add_done_callback(lambda _: self._in_flight.pop(key, None))
+
+        # A caller being cancelled must not cancel the request of the others
+        return await asyncio.shield(request)
+
+    async def async_stream_records(
+        self, dataset: str, params: dict[str, Any]
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield the records of a dataset export as they are received.
+
+        Unlike the records endpoint, exports aren't limited to a page of
+        records. Records are decoded one at a time off the response, and
+        the download stops when the iterator is closed, for example with
+        contextlib.aclosing when leaving the loop early. Exports are not
+        cached.
+        """
+        url = f"{self._base_url}/catalog/datasets/{dataset}/exports/json"
+        now = time.monotonic()
+        if not self.breaker.allow_request(now):
+            raise Eco2mixCircuitOpenError("API requests paused after failures")
+        probe = self.breaker.state(now) == STATE_HALF_OPEN
+
+        self.stats.requests += 1
+        start = time.monotonic()
+        try:
+            async with self._session.get(
+                url,
+                params=params,
+                # An export takes longer than a request, only waits are bounded
+                timeout=aiohttp.ClientTimeout(
+                    sock_connect=self._timeout.total, sock_read=self._timeout.total
+                ),
+            ) as response:
+                response.raise_for_status()
+                self.stats.record_latency(time.monotonic() - start)
+                self.breaker.record_success()
+                async for record in _iter_json_array(response.content, self.stats):
+                    self.stats.records_received += 1
+                    yield record
+        except TimeoutError as err:
+            self._record_failure(err)
+            raise Eco2mixApiError("API request timed out") from err
+        except (aiohttp.ClientError, ValueError) as err:
+            self._record_failure(err)
+            raise Eco2mixApiError(err) from err
+        finally:
+            if probe:
+                self.breaker.release_probe()
+
+    async def _async_request(
+        self, key: tuple, dataset: str, params: dict[str, Any], probe: bool
+    ) -> list[dict[str, Any]]:
+        """Request the records of a dataset from the API and cache them.
+
+        The probe of the circuit breaker, if the request is it, is released
+        when the request ends, even cancelled.
+        """
+        url = f"{self._base_url}/catalog/datasets/{dataset}/records"
+
+        self.stats.requests += 1
+        start = time.monotonic()
+        try:
+            async with self._session.get(
+                url, params=params, timeout=self._timeout
+            ) as response:
+                response.raise_for_status()
+                body = await response.read()
+                data = await response.json()
+                results = data["results"]
+        except TimeoutError as err:
+            self._record_failure(err)
+            raise Eco2mixApiError("API request timed out") from err
+        except (aiohttp.ClientError, ValueError, KeyError) as err:
+            self._record_failure(err)
+            raise Eco2mixApiError(err) from err
+        finally:
+            self.stats.record_latency(time.monotonic() - start)
+            if probe:
+                self.breaker.release_probe()
+
+        self.breaker.record_success()
+        self.stats.bytes_received += len(body)
+        self.stats.records_received += len(results)
+
+        now = time.monotonic()
+        self._cache = {
+            cache_key: entry
+            for cache_key, entry in self._cache.items()
+            if entry[0] > now
+        }
+        # No records yet is not cached, so a retry asks the API again
+        if results:
+            self._cache[key] = (now + self._cache_ttl, results)
+        return results
+
+    def _record_failure(self, err: Exception) -> None:
+        """Count a failed request, against the API if it is unavailable.
+
+        Only server errors, timeouts and connection errors count towards
+        opening the circuit. A client error is an answer of the API, and an
+        invalid body doesn't tell whether it is available.
+        """
+        self.stats.failures += 1
+        if isinstance(err, aiohttp.ClientResponseError) and err.status < 500:
+            self.breaker.record_success()
+        elif isinstance(err, (TimeoutError, aiohttp.ClientError)):
+            self.breaker.record_failure(time.monotonic())
@@ -0,0 +1,62 @@
+"""Support for éCO2mix binary sensors."""
+
+from typing import Any
+
+from homeassistant.components.binary_sensor import BinarySensorEntity
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from . import Eco2mixConfigEntry
+from .const import DOMAIN
+from .coordinator import Eco2mixDataUpdateCoordinator
+from .thresholds import Threshold
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: Eco2mixConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up éco2mix binary sensor entities based on a config entry."""
+    coordinator = config_entry.runtime_data.coordinator
+    async_add_entities(
+        Eco2mixThresholdBinarySensor(coordinator, threshold)
+        for threshold in coordinator.thresholds
+    )
+
+
+class Eco2mixThresholdBinarySensor(
+    CoordinatorEntity[Eco2mixDataUpdateCoordinator], BinarySensorEntity
+):
+    """Define whether an Eco2Mix value is above its threshold."""
+
+    _attr_has_entity_name = True
+
+    def __init__(
+        self, coordinator: Eco2mixDataUpdateCoordinator, threshold: Threshold
+    ) -> None:
+        """Initialize."""
+        super().__init__(coordinator)
+        self._attr_device_info = DeviceInfo(
+            entry_type=DeviceEntryType.SERVICE,
+            identifiers={(DOMAIN, "eco2mix_device")},
+        )
+        self._attr_unique_id = f"eco2mix-{threshold.threshold_id}_above_threshold"
+        self._attr_translation_key = f"{threshold.key}_above_threshold"
+        self._attr_translation_placeholders = {"threshold": f"{threshold.threshold:g}"}
+        self._threshold = threshold
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return whether the value is above the threshold."""
+        return self._threshold.above
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the threshold and its hysteresis."""
+        return {
+            "threshold": self._threshold.threshold,
+            "hysteresis": self._threshold.hysteresis,
+        }
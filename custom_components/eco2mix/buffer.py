@@ -0,0 +1,122 @@
+"""In-memory buffer of recent eco2mix records."""
+
+from array import array
+from bisect import bisect_left
+from datetime import UTC, datetime
+import math
+from typing import Any
+
+from .const import ALL_PRODUCTION_SOURCES, BUFFER_DURATION, PUBLICATION_PERIOD
+
+# Buffered columns, production sources first in ALL_PRODUCTION_SOURCES order
+BUFFER_FIELDS = [
+    *ALL_PRODUCTION_SOURCES,
+    "consumption",
+    "pumping",
+    "import",
+    "export",
+    "carbon_intensity",
+]
+
+
+class _LogicalView:
+    """Sequence view of the buffer timestamps, oldest first, for bisect."""
+
+    def __init__(self, buffer: "Eco2mixBuffer") -> None:
+        self._buffer = buffer
+
+    def __len__(self) -> int:
+        return self._buffer._size
+
+    def __getitem__(self, index: int) -> float:
+        return self._buffer._timestamps[self._buffer._physical(index)]
+
+
+class Eco2mixBuffer:
+    """Fixed-size ring buffer of recent eco2mix records.
+
+    Each field is stored in its own array of floats, missing values being
+    stored as NaN, so the memory used doesn't depend on how long the
+    buffer has been running. Records are kept sorted by timestamp; a late
+    record is inserted at its place and a record with an already buffered
+    timestamp replaces it.
+
+    The buffer only holds the records saved with the snapshot, the rolling
+    statistics keeping their own windows.
+    """
+
+    def __init__(self, capacity: int = BUFFER_DURATION // PUBLICATION_PERIOD) -> None:
+        """Initialize."""
+        self._capacity = capacity
+        self._timestamps = array("d", [0.0]) * capacity
+        self._columns = {
+            field: array("d", [math.nan]) * capacity for field in BUFFER_FIELDS
+        }
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Return the number of buffered records."""
+        return self._size
+
+    def add(self, record: dict[str, Any]) -> None:
+        """Add a processed record to the buffer."""
+        timestamp = record["timestamp"].timestamp()
+        view = _LogicalView(self)
+        index = bisect_left(view, timestamp)
+
+        if index < self._size and view[index] == timestamp:
+            self._write(index, timestamp, record)
+            return
+
+        if self._size == self._capacity:
+            if index == 0:
+                # Older than everything in a full buffer
+                return
+            self._start = (self._start + 1) % self._capacity
+            self._size -= 1
+            index -= 1
+
+        for position in range(self._size, index, -1):
+            self._move(position - 1, position)
+        self._size += 1
+        self._write(index, timestamp, record)
+
+    def extend(self, records: list[dict[str, Any]]) -> None:
+        """Add several processed records to the buffer."""
+        for record in sorted(records, key=lambda record: record["timestamp"]):
+            self.add(record)
+
+    def records(self) -> list[dict[str, Any]]:
+        """Return the buffered records, oldest first, missing values as None."""
+        records = []
+        for index in range(self._size):
+            position = self._physical(index)
+            record: dict[str, Any] = {
+                "timestamp": datetime.fromtimestamp(self._timestamps[position], UTC)
+            }
+            for field, column in self._columns.items():
+                value = column[position]
+                record[field] = None if math.isnan(value) else value
+            records.append(record)
+        return records
+
+    def _physical(self, index: int) -> int:
+        """Return the array position of the record at the given index."""
+        return (self._start + index) % self._capacity
+
+    def _move(self, source: int, target: int) -> None:
+        """Copy the record at the source index to the target index."""
+        source = self._physical(source)
+        target = self._physical(target)
+        self._timestamps[target] = self._timestamps[source]
+        for column in self._columns.values():
+            column[target] = column[source]
+
+    def _write(self, index: int, timestamp: float, record: dict[str, Any]) -> None:
+        """Write a record at the given index."""
+        position = self._physical(index)
+        self._timestamps[position] = timestamp
+        for field, column in self._columns.items():
+            value = record.get(field)
+            column[position] = math.nan if value is None else value
@@ -0,0 +1,79 @@
+"""Circuit breaker of the ODRE API requests."""
+
+from .const import CIRCUIT_COOLDOWN, CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_MAX_COOLDOWN
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Circuit breaker pausing the requests to a failing API.
+
+    After a number of consecutive failures the circuit opens and requests
+    are refused for a cooldown. Once the cooldown has elapsed the circuit
+    is half open: a single probe request is let through, which closes the
+    circuit if it succeeds or opens it again for twice the cooldown if it
+    fails. Times are monotonic clock seconds.
+    """
+
+    def __init__(
+        self,
+        threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        cooldown: float = CIRCUIT_COOLDOWN,
+        max_cooldown: float = CIRCUIT_MAX_COOLDOWN,
+    ) -> None:
+        """Initialize."""
+        self._threshold = threshold
+        self._min_cooldown = cooldown
+        self._max_cooldown = max_cooldown
+        self._cooldown = cooldown
+        self._failures = 0
+        self._open_until: float | None = None
+        self._probing = False
+        self.opened = 0
+
+    def state(self, now: float) -> str:
+        """Return the state of the circuit."""
+        if self._open_until is None:
+            return STATE_CLOSED
+        if now < self._open_until:
+            return STATE_OPEN
+        return STATE_HALF_OPEN
+
+    def allow_request(self, now: float) -> bool:
+        """Return whether a request can be made, reserving the probe if so."""
+        state = self.state(now)
+        if state == STATE_CLOSED:
+            return True
+        if state == STATE_OPEN or self._probing:
+            return False
+        self._probing = True
+        return True
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful request."""
+        self._failures = 0
+        self._cooldown = self._min_cooldown
+        self._open_until = None
+        self._probing = False
+
+    def release_probe(self) -> None:
+        """Let another probe through if the probe ended without an outcome.
+
+        A probe cancelled or failing for a reason unrelated to the API
+        neither closes nor opens the circuit again.
+        """
+        self._probing = False
+
+    def record_failure(self, now: float) -> None:
+        """Count a failed request, opening the circuit if needed."""
+        self._failures += 1
+        if self._probing:
+            self._probing = False
+            self._cooldown = min(self._cooldown * 2, self._max_cooldown)
+        elif self._open_until is not None or self._failures < self._threshold:
+            return
+        else:
+            self.opened += 1
+        self._open_until = now + self._cooldown
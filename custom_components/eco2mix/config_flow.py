@@ -5,14 +5,73 @@ from typing import Any
 import voluptuous as vol
 
 from homeassistant.config_entries import (
+    ConfigEntry,
     ConfigFlow,
     ConfigFlowResult,
+    OptionsFlow,
 )
 from homeassistant.core import callback
+from homeassistant.data_entry_flow import section
+from homeassistant.helpers.selector import (
+    SelectOptionDict,
+    SelectSelector,
+    SelectSelectorConfig,
+    TextSelector,
+    TextSelectorConfig,
+    TextSelectorType,
+)
 
 from .const import (
+    CONF_BACKFILL_DAYS,
+    CONF_EMISSION_FACTORS,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_PERSIST_HISTORY,
+    CONF_REGIONS,
+    CONF_ROLLING_WINDOWS,
+    CONF_STALE_AFTER,
+    CONF_THRESHOLDS,
+    DEFAULT_BACKFILL_DAYS,
+    DEFAULT_EMISSION_FACTORS,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_PERSIST_HISTORY,
+    DEFAULT_ROLLING_WINDOWS,
+    DEFAULT_STALE_AFTER,
     DOMAIN,
+    MAX_BACKFILL_DAYS,
+    REGIONS,
+    ROLLING_WINDOWS,
 )
+from .thresholds import THRESHOLD_KEYS
+
+
+def _thresholds_schema(thresholds: dict[str, Any]) -> vol.Schema:
+    """Return the schema of the thresholds, any number of them per key."""
+    schema: dict[vol.Marker, Any] = {}
+    for key in THRESHOLD_KEYS:
+        schema[
+            vol.Optional(
+                key, default=[f"{value:g}" for value in thresholds.get(key, [])]
+            )
+        ] = TextSelector(
+            TextSelectorConfig(type=TextSelectorType.NUMBER, multiple=True)
+        )
+        schema[
+            vol.Optional(
+                f"{key}_hysteresis", default=thresholds.get(f"{key}_hysteresis", 0.0)
+            )
+        ] = vol.All(vol.Coerce(float), vol.Range(min=0))
+    return vol.Schema(schema)
+
+
+def _parse_thresholds(thresholds: dict[str, Any]) -> dict[str, Any]:
+    """Return the thresholds entered as numbers, raise ValueError if not."""
+    return {
+        **thresholds,
+        **{
+            key: sorted({float(value) for value in thresholds.get(key, []) if value})
+            for key in THRESHOLD_KEYS
+        },
+    }
 
 
 class Eco2mixConfigFlow(ConfigFlow, domain=DOMAIN):
@@ -20,6 +79,12 @@ class Eco2mixConfigFlow(ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        """Get the options flow for this handler."""
+        return Eco2mixOptionsFlow()
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
@@ -32,3 +97,103 @@ class Eco2mixConfigFlow(ConfigFlow, domain=DOMAIN):
     async def async_step_import(self, import_data: dict[str, Any]) -> ConfigFlowResult:
         """Handle import from configuration.yaml."""
         return await self.async_step_user(import_data)
+
+
+class Eco2mixOptionsFlow(OptionsFlow):
+    """Handle éCO2mix options."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the options."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            try:
+                user_input[CONF_THRESHOLDS] = _parse_thresholds(
+                    user_input[CONF_THRESHOLDS]
+                )
+            except ValueError:
+                errors[CONF_THRESHOLDS] = "invalid_threshold"
+            else:
+                return self.async_create_entry(data=user_input)
+
+        emission_factors = {
+            **DEFAULT_EMISSION_FACTORS,
+            **self.config_entry.options.get(CONF_EMISSION_FACTORS, {}),
+        }
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_REGIONS,
+                        default=self.config_entry.options.get(CONF_REGIONS, []),
+                    ): SelectSelector(
+                        SelectSelectorConfig(
+                            options=[
+                                SelectOptionDict(value=code, label=name)
+                                for code, name in REGIONS.items()
+                            ],
+                            multiple=True,
+                        )
+                    ),
+                    vol.Optional(
+                        CONF_MAX_SCAN_INTERVAL,
+                        default=self.config_entry.options.get(
+                            CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=5, max=120)),
+                    vol.Optional(
+                        CONF_STALE_AFTER,
+                        default=self.config_entry.options.get(
+                            CONF_STALE_AFTER, DEFAULT_STALE_AFTER
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=30, max=1440)),
+                    vol.Optional(
+                        CONF_BACKFILL_DAYS,
+                        default=self.config_entry.options.get(
+                            CONF_BACKFILL_DAYS, DEFAULT_BACKFILL_DAYS
+                        ),
+                    ): vol.All(
+                        vol.Coerce(int), vol.Range(min=0, max=MAX_BACKFILL_DAYS)
+                    ),
+                    vol.Optional(
+                        CONF_PERSIST_HISTORY,
+                        default=self.config_entry.options.get(
+                            CONF_PERSIST_HISTORY, DEFAULT_PERSIST_HISTORY
+                        ),
+                    ): bool,
+                    vol.Optional(
+                        CONF_ROLLING_WINDOWS,
+                        default=self.config_entry.options.get(
+                            CONF_ROLLING_WINDOWS, DEFAULT_ROLLING_WINDOWS
+                        ),
+                    ): SelectSelector(
+                        SelectSelectorConfig(
+                            options=ROLLING_WINDOWS,
+                            multiple=True,
+                            translation_key=CONF_ROLLING_WINDOWS,
+                        )
+                    ),
+                    vol.Required(CONF_EMISSION_FACTORS): section(
+                        vol.Schema(
+                            {
+                                vol.Optional(source, default=factor): vol.All(
+                                    vol.Coerce(float), vol.Range(min=0)
+                                )
+                                for source, factor in emission_factors.items()
+                            }
+                        ),
+                        {"collapsed": True},
+                    ),
+                    vol.Required(CONF_THRESHOLDS): section(
+                        _thresholds_schema(
+                            self.config_entry.options.get(CONF_THRESHOLDS, {})
+                        ),
+                        {"collapsed": True},
+                    ),
+                }
+            ),
+            errors=errors,
+        )
@@ -3,15 +3,140 @@
 from datetime import timedelta
 
 DOMAIN = "eco2mix"
+DATA_CLIENT = "client"
 DEFAULT_SCAN_INTERVAL = 5  # minutes
 SCAN_INTERVAL = timedelta(minutes=DEFAULT_SCAN_INTERVAL)
 
+CONF_MAX_SCAN_INTERVAL = "max_scan_interval"
+DEFAULT_MAX_SCAN_INTERVAL = 30  # minutes
+CONF_STALE_AFTER = "stale_after"
+DEFAULT_STALE_AFTER = 120  # minutes
+CONF_BACKFILL_DAYS = "backfill_days"
+DEFAULT_BACKFILL_DAYS = 3
+MAX_BACKFILL_DAYS = 7
+
+# Thresholds of the processed keys, crossings firing an event
+CONF_THRESHOLDS = "thresholds"
+EVENT_THRESHOLD_CROSSED = "eco2mix_threshold_crossed"
+
+# Time zone of the RTE publications
+TIME_ZONE = "Europe/Paris"
+
+# Adaptive polling
+MIN_SCAN_INTERVAL = timedelta(minutes=1)
+PUBLICATION_PERIOD = timedelta(minutes=15)
+DEFAULT_PUBLICATION_LAG = timedelta(minutes=20)
+PUBLICATION_MARGIN = timedelta(minutes=1)
+BACKOFF_JITTER = 0.2
+
+# Consumption forecast and best window search
+FORECAST_REFRESH_INTERVAL = timedelta(hours=1)
+FORECAST_RETRY_INTERVAL = timedelta(minutes=5)
+DEFAULT_WINDOW_DURATION = timedelta(hours=2)
+DEFAULT_WINDOW_HORIZON = timedelta(hours=24)
+
+# Import of the past days missing from the statistics
+HISTORY_REFRESH_INTERVAL = timedelta(days=1)
+HISTORY_RETRY_INTERVAL = timedelta(hours=1)
+
+# Recent records kept in memory
+BUFFER_DURATION = timedelta(hours=48)
+# Windows of the rolling statistics, in hours, within the buffer duration
+CONF_ROLLING_WINDOWS = "rolling_windows"
+DEFAULT_ROLLING_WINDOWS = ["24"]
+ROLLING_WINDOWS = ["1", "3", "6", "12", "24", "48"]
+# Intervals remembered by the energy sensors to count late records once
+ENERGY_WINDOW = timedelta(days=MAX_BACKFILL_DAYS + 1)
+
 POWER_MEGA_WATT = "MW"
+CARBON_INTENSITY = "gCO2eq/kWh"
+
+API_BASE_URL = "https://odre.opendatasoft.com/api/explore/v2.1"
+API_TIMEOUT = 10  # seconds
+API_PAGE_SIZE = 100  # maximum number of records per request
+API_CACHE_TTL = 60  # seconds
+# Upper bounds of the request latency histogram buckets, in seconds
+API_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Consecutive failed requests opening the circuit, and how long it stays open
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_COOLDOWN = 300  # seconds, doubled after each failed probe
+CIRCUIT_MAX_COOLDOWN = 3600  # seconds
+NATIONAL_DATASET = "eco2mix-national-tr"
+# Columns read by the coordinator when processing a record
+NATIONAL_FIELDS = [
+    "date_heure",
+    "consommation",
+    "nucleaire",
+    "eolien",
+    "solaire",
+    "hydraulique",
+    "bioenergies",
+    "gaz",
+    "charbon",
+    "fioul",
+    "pompage",
+    "ech_physiques",
+]
+FORECAST_FIELDS = ["date_heure", "prevision_j", "prevision_j1"]
+# Consolidated then definitive national data, exported by the export_history
+# service, with the columns of the real-time dataset
+CONSOLIDATED_DATASET = "eco2mix-national-cons-def"
+EXPORT_CONCURRENCY = 2  # parts of an export downloaded at once
+REGIONAL_DATASET = "eco2mix-regional-tr"
+REGIONAL_FIELDS = [
+    "code_insee_region",
+    "date_heure",
+    "consommation",
+    "nucleaire",
+    "eolien",
+    "solaire",
+    "hydraulique",
+    "bioenergies",
+    "thermique",
+    "pompage",
+    "ech_physiques",
+]
 
-# Sources definition for aggregates
+# Regions covered by the regional dataset, by INSEE code
+CONF_REGIONS = "regions"
+REGIONS = {
+    "84": "Auvergne-Rhône-Alpes",
+    "27": "Bourgogne-Franche-Comté",
+    "53": "Bretagne",
+    "24": "Centre-Val de Loire",
+    "44": "Grand Est",
+    "32": "Hauts-de-France",
+    "11": "Île-de-France",
+    "28": "Normandie",
+    "75": "Nouvelle-Aquitaine",
+    "76": "Occitanie",
+    "52": "Pays de la Loire",
+    "93": "Provence-Alpes-Côte d'Azur",
+}
+
+# Sources definition for aggregates. The national dataset details gas, coal
+# and fuel, the regional one only reports their total as thermal.
 RENEWABLE_SOURCES = ["wind", "solar", "hydraulic", "bioenergy"]
 LOW_CARBON_SOURCES = [*RENEWABLE_SOURCES, "nuclear"]
-ALL_PRODUCTION_SOURCES = [*LOW_CARBON_SOURCES, "gas", "coal", "fuel"]
+ALL_PRODUCTION_SOURCES = [*LOW_CARBON_SOURCES, "gas", "coal", "fuel", "thermal"]
+
+# Direct emission factors used by RTE, in gCO2eq/kWh
+CONF_EMISSION_FACTORS = "emission_factors"
+DEFAULT_EMISSION_FACTORS = {
+    "nuclear": 0,
+    "wind": 0,
+    "solar": 0,
+    "hydraulic": 0,
+    "bioenergy": 494,
+    "gas": 429,
+    "coal": 986,
+    "fuel": 777,
+    "thermal": 429,
+}
 
-STORAGE_VERSION = 1
+STORAGE_VERSION = 2
+STORAGE_MINOR_VERSION = 2
 STORAGE_KEY = "eco2mix_cache"
+STORAGE_SAVE_DELAY = 60  # seconds
+CONF_PERSIST_HISTORY = "persist_history"
+DEFAULT_PERSIST_HISTORY = False
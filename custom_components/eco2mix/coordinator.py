@@ -1,69 +1,383 @@
 """DataUpdateCoordinator for eco2mix."""
 
-from datetime import datetime, timedelta
+from dataclasses import dataclass
+from collections.abc import Iterable
+from datetime import date, datetime, timedelta
 import logging
-from typing import Any
+from pathlib import Path
+import time
+from typing import TYPE_CHECKING, Any
 
-import pytz
-import requests
-
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.storage import Store
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.util import dt as dt_util
 
+from .api import (
+    Eco2mixApiClient,
+    Eco2mixApiError,
+    Eco2mixApiStats,
+    Eco2mixCircuitOpenError,
+)
+from .buffer import BUFFER_FIELDS, Eco2mixBuffer
 from .const import (
     ALL_PRODUCTION_SOURCES,
+    API_PAGE_SIZE,
     DOMAIN,
-    LOW_CARBON_SOURCES,
-    RENEWABLE_SOURCES,
-    STORAGE_KEY,
-    STORAGE_VERSION,
+    EVENT_THRESHOLD_CROSSED,
+    FORECAST_FIELDS,
+    FORECAST_REFRESH_INTERVAL,
+    FORECAST_RETRY_INTERVAL,
+    HISTORY_REFRESH_INTERVAL,
+    HISTORY_RETRY_INTERVAL,
+    NATIONAL_DATASET,
+    NATIONAL_FIELDS,
+    PUBLICATION_PERIOD,
+    REGIONAL_DATASET,
+    REGIONAL_FIELDS,
+    STORAGE_SAVE_DELAY,
+    TIME_ZONE,
 )
+from .energy import ENERGY_KEYS, Eco2mixEnergy
+from .export import Eco2mixExport
+from .forecast import Eco2mixForecast
+from .processing import MetricSubscriptions, add_metrics, process_records
+from .rolling import ROLLING_KEYS, Eco2mixRolling
+from .scheduler import PublicationScheduler
+from .thresholds import Threshold
+from .storage import Eco2mixStore, decode_records, encode_record
+
+if TYPE_CHECKING:
+    from .history import Eco2mixHistory
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@dataclass
+class WriteStats:
+    """Counters of the entity state writes triggered by updates."""
+
+    emitted: int = 0
+    suppressed: int = 0
+
+
+def changed_keys(old: dict[str, Any] | None, new: dict[str, Any]) -> set[str]:
+    """Return the keys of the new data whose value differs from the old one."""
+    if old is None:
+        return set(new)
+    return {key for key, value in new.items() if key not in old or old[key] != value}
+
+
 class Eco2mixDataUpdateCoordinator(DataUpdateCoordinator):
     """Class to manage fetching eco2mix data."""
 
-    def __init__(self, hass: HomeAssistant, scan_interval: int) -> None:
+    _history: "Eco2mixHistory | None"
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: Eco2mixApiClient,
+        scan_interval: int,
+        max_scan_interval: int,
+        stale_after: int,
+        backfill_days: int,
+        emission_factors: dict[str, float],
+        persist_history: bool,
+        rolling_windows: list[int],
+        thresholds: list[Threshold],
+    ) -> None:
         """Initialize."""
         super().__init__(
             hass, _LOGGER, name=DOMAIN, update_interval=timedelta(minutes=scan_interval)
         )
-        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._scheduler = PublicationScheduler(timedelta(minutes=max_scan_interval))
+        self._stale_after = timedelta(minutes=stale_after)
+        self._client = client
+        self._store = Eco2mixStore(hass)
+        self._history = None
+        history_keys: list[str] = []
+        if "recorder" in hass.config.components:
+            # Imported with the recorder only, whose modules it loads
+            from .history import HISTORY_KEYS, Eco2mixHistory
+
+            self._history = Eco2mixHistory(hass)
+            history_keys = list(HISTORY_KEYS)
+        self._emission_factors = emission_factors
+        self._metrics = MetricSubscriptions(
+            [
+                *BUFFER_FIELDS,
+                *ENERGY_KEYS,
+                *history_keys,
+                *(ROLLING_KEYS if rolling_windows else ()),
+                *(threshold.key for threshold in thresholds),
+            ]
+        )
+        # Only kept to be saved with the snapshot
+        self.buffer = Eco2mixBuffer() if persist_history else None
+        self.energy = Eco2mixEnergy()
+        self.rolling = Eco2mixRolling(rolling_windows)
+        self.thresholds = thresholds
+        # Data refreshed at a slower pace, sharing the client and its cache
+        self.forecast_coordinator = Eco2mixForecastCoordinator(hass, client)
+        self.history_coordinator = (
+            Eco2mixHistoryCoordinator(hass, client, self, self._history, backfill_days)
+            if self._history and backfill_days
+            else None
+        )
         self._last_timestamp = None
         self._cached_data = None
         self._failed_updates = 0
         self._last_successful_update = None
+        self.changed_keys: set[str] = set()
+        self.write_stats = WriteStats()
+
+    async def _async_setup(self) -> None:
+        """Load the statistics already imported in the recorder."""
+        if self._history:
+            await self._history.async_load()
+
+    @callback
+    def async_subscribe_metrics(self, metrics: Iterable[str]) -> CALLBACK_TYPE:
+        """Subscribe to processed metrics, computed until unsubscribed."""
+        unsubscribe = self._metrics.subscribe(metrics)
+        if self.data is not None and not self._metrics.metrics <= self.data.keys():
+            self.data = self._cached_data = add_metrics(
+                self.data, self._metrics.metrics, self._emission_factors
+            )
+        return unsubscribe
+
+    @property
+    def metrics(self) -> set[str]:
+        """Return the metrics computed when processing records."""
+        return self._metrics.metrics
+
+    @property
+    def api_stats(self) -> Eco2mixApiStats:
+        """Return the statistics of the API requests."""
+        return self._client.stats
+
+    @property
+    def circuit_state(self) -> dict[str, Any]:
+        """Return the state of the circuit breaker of the API requests."""
+        breaker = self._client.breaker
+        return {"state": breaker.state(time.monotonic()), "opened": breaker.opened}
+
+    @property
+    def consecutive_failures(self) -> int:
+        """Return the number of failed updates since the last success."""
+        return self._failed_updates
+
+    @property
+    def last_successful_update(self) -> datetime | None:
+        """Return when the API was last successfully polled."""
+        return self._last_successful_update
+
+    @property
+    def publication_lag(self) -> timedelta:
+        """Return the estimated publication lag of the records."""
+        return self._scheduler.publication_lag
+
+    @property
+    def staleness(self) -> timedelta | None:
+        """Return the age of the data."""
+        if not self.data:
+            return None
+        return dt_util.utcnow() - self.data["timestamp"]
+
+    @property
+    def refresh_due(self) -> bool:
+        """Return whether newer data than the current one may be published."""
+        if not self.data:
+            return True
+        expected = (
+            self.data["timestamp"]
+            + PUBLICATION_PERIOD
+            + self._scheduler.publication_lag
+        )
+        return dt_util.utcnow() >= expected
+
+    async def async_restore(self) -> bool:
+        """Serve the persisted snapshot until the next refresh.
+
+        Return False when there is no snapshot or when it is outdated, in
+        which case the data must be fetched from the API. Newer data may
+        have been published since the snapshot, see refresh_due.
+        """
+        data = await self._async_load_snapshot()
+        if data is None:
+            return False
+        self._cached_data = data
+
+        now = dt_util.utcnow()
+        if now - data["timestamp"] > self._stale_after:
+            return False
+
+        _LOGGER.debug("Restored data from %s", data["timestamp"])
+        for threshold in self.thresholds:
+            threshold.update(data.get(threshold.key))
+        await self._async_setup()
+        self._last_timestamp = data["timestamp"]
+        self.update_interval = self._scheduler.next_interval(self._last_timestamp, now)
+        self.changed_keys = changed_keys(self.data, data)
+        self.async_set_updated_data(data)
+        return True
+
+    async def _async_load_snapshot(self) -> dict[str, Any] | None:
+        """Load the last data saved in the store.
+
+        The recent records saved along with it are restored in the buffer,
+        and the cumulated energy if it hasn't been counted yet.
+        """
+        stored = await self._store.async_load()
+        if not stored:
+            return None
+        if not self.energy and stored["energy"]:
+            self.energy.restore(stored["energy"])
+        records = process_records(
+            decode_records(stored["sources"], [*stored["history"], stored["latest"]]),
+            self._emission_factors,
+            self._metrics.metrics,
+        )
+        if self.buffer is not None:
+            self.buffer.extend(records[:-1])
+        self.rolling.add_records(records)
+        return records[-1]
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to persist in the store."""
+        return {
+            "sources": ALL_PRODUCTION_SOURCES,
+            "latest": encode_record(self._cached_data),
+            "history": (
+                [encode_record(record) for record in self.buffer.records()]
+                if self.buffer is not None
+                else []
+            ),
+            "energy": self.energy.as_dict(),
+        }
+
+    @callback
+    def async_add_backfilled_records(self, results: list[dict[str, Any]]) -> None:
+        """Process backfilled records and import them in the statistics."""
+        records = process_records(
+            results, self._emission_factors, self._metrics.metrics
+        )
+        self._add_recent_records(records)
+        if self._history:
+            self._history.async_add_records(records)
+
+    @callback
+    def _add_recent_records(self, records: list[dict[str, Any]]) -> None:
+        """Add processed records to the rolling statistics and the buffer."""
+        if self.buffer is not None:
+            self.buffer.extend(records)
+        self.rolling.add_records(records)
+
+    @callback
+    def async_handle_backfill(self) -> None:
+        """Persist and show the late intervals added by a backfill."""
+        if self._cached_data is not None:
+            self._store.async_delay_save(self._data_to_save, STORAGE_SAVE_DELAY)
+        self.async_update_listeners()
+
+    async def async_export_history(
+        self, start: date, end: date, path: Path
+    ) -> dict[str, Any]:
+        """Export the consolidated records of a range of days to a file."""
+        export = Eco2mixExport(self.hass, self._client, self._emission_factors, path)
+        return await export.async_export(start, end)
+
+    def best_window(
+        self, duration: timedelta, horizon: timedelta
+    ) -> tuple[datetime, datetime, float] | None:
+        """Return the upcoming window with the lowest forecast consumption."""
+        return self.forecast_coordinator.best_window(duration, horizon)
 
     async def _async_update_data(self) -> dict[str, Any]:
         """Fetch data from API endpoint."""
         try:
-            data = await self.hass.async_add_executor_job(self._get_data)
+            data = await self._async_fetch()
+        finally:
+            self.update_interval = self._scheduler.next_interval(
+                self._last_timestamp, dt_util.utcnow()
+            )
+
+        # Outdated values are made unavailable rather than served as current
+        if dt_util.utcnow() - data["timestamp"] > self._stale_after:
+            raise UpdateFailed(f"Latest data from {data['timestamp']} is outdated")
+
+        if self.data is None or data["timestamp"] != self.data["timestamp"]:
+            self._async_check_thresholds(data)
+        self.changed_keys = changed_keys(self.data, data)
+        return data
+
+    @callback
+    def _async_check_thresholds(self, data: dict[str, Any]) -> None:
+        """Fire an event for each threshold crossed by a new interval."""
+        for threshold in self.thresholds:
+            if threshold.update(data.get(threshold.key)):
+                self.hass.bus.async_fire(
+                    EVENT_THRESHOLD_CROSSED,
+                    {
+                        "threshold_id": threshold.threshold_id,
+                        "key": threshold.key,
+                        "threshold": threshold.threshold,
+                        "direction": "above" if threshold.above else "below",
+                        "value": data[threshold.key],
+                        "timestamp": data["timestamp"].isoformat(),
+                    },
+                )
+
+    async def _async_fetch(self) -> dict[str, Any]:
+        """Fetch the latest data, falling back to the cache on failure."""
+        try:
+            records = await self._async_get_records()
+
+            self._add_recent_records(records)
+            self.energy.add_records(records)
+            if self._history and records:
+                self._history.async_add_records(records)
 
-            if data is None:
+            if not records and self._last_timestamp is None:
                 _LOGGER.error("No data received from API")
+                self._scheduler.record_miss()
                 return await self._handle_api_failure()
 
-            if self._last_timestamp == data.get("timestamp"):
+            if not records:
                 _LOGGER.debug("Data hasn't changed since last update")
-                return self.data if self.data else data
+                self._scheduler.record_miss(dt_util.utcnow())
+                return self.data if self.data else self._cached_data
+
+            data = records[0]
+
+            if (
+                self._last_timestamp is not None
+                and data["timestamp"] - self._last_timestamp == PUBLICATION_PERIOD
+            ):
+                self._scheduler.record_publication(data["timestamp"], dt_util.utcnow())
+            else:
+                self._scheduler.reset_misses()
 
             # Reset failure counter on successful update
             self._failed_updates = 0
             self._last_successful_update = dt_util.utcnow()
             self._last_timestamp = data.get("timestamp")
 
-            # Store successful data
-            await self._store.async_save(data)
+            # Store successful data, grouping writes of close updates
             self._cached_data = data
+            self._store.async_delay_save(self._data_to_save, STORAGE_SAVE_DELAY)
 
             return data
 
-        except requests.exceptions.RequestException as err:
+        except Eco2mixCircuitOpenError as err:
             self._failed_updates += 1
+            self._scheduler.record_miss()
+            _LOGGER.debug("Skipping API request: %s", err)
+            return await self._handle_api_failure()
+
+        except Eco2mixApiError as err:
+            self._failed_updates += 1
+            self._scheduler.record_miss()
             _LOGGER.error(
                 "API request failed: %s (Attempt %d)", err, self._failed_updates
             )
@@ -71,6 +385,7 @@ class Eco2mixDataUpdateCoordinator(DataUpdateCoordinator):
 
         except Exception as err:
             self._failed_updates += 1
+            self._scheduler.record_miss()
             _LOGGER.exception("Unexpected error: %s", err)
             return await self._handle_api_failure()
 
@@ -88,7 +403,7 @@ class Eco2mixDataUpdateCoordinator(DataUpdateCoordinator):
             )
 
         if not self._cached_data:
-            self._cached_data = await self._store.async_load()
+            self._cached_data = await self._async_load_snapshot()
 
         if self._cached_data:
             _LOGGER.debug(
@@ -98,106 +413,285 @@ class Eco2mixDataUpdateCoordinator(DataUpdateCoordinator):
 
         raise UpdateFailed("No cached data available")
 
-    def _get_data(self) -> dict[str, Any]:
-        """Get the latest data from eco2mix."""
-        paris_tz = pytz.timezone("Europe/Paris")
-        current_time = datetime.now(paris_tz)
-        date_str = current_time.strftime("%Y/%m/%d")
+    async def _async_get_records(self) -> list[dict[str, Any]]:
+        """Get the processed eco2mix records, newest first.
 
-        url = "https://odre.opendatasoft.com/api/explore/v2.1/catalog/datasets/eco2mix-national-tr/records"
+        The first poll fetches the records of the day; later polls only ask
+        for records newer than the last one seen.
+        """
         params = {
-            "limit": 100,
-            "refine": f"date_heure:{date_str}",
+            "select": ",".join(NATIONAL_FIELDS),
+            "where": "consommation is not null",
             "order_by": "date_heure desc",
+            "limit": API_PAGE_SIZE,
+        }
+
+        if self._last_timestamp is None:
+            current_time = dt_util.now(dt_util.get_time_zone(TIME_ZONE))
+            params["refine"] = f"date_heure:{current_time.strftime('%Y/%m/%d')}"
+        else:
+            params["where"] += (
+                f" and date_heure > date'{self._last_timestamp.isoformat()}'"
+            )
+
+        results = await self._client.async_get_records(NATIONAL_DATASET, params)
+
+        return process_records(results, self._emission_factors, self._metrics.metrics)
+
+    @staticmethod
+    def _to_kw(value: float | None) -> float | None:
+        """Convert MW to kW."""
+        return value
+
+
+class Eco2mixForecastCoordinator(DataUpdateCoordinator[Eco2mixForecast]):
+    """Class to manage fetching the consumption forecast.
+
+    It changes a few times a day at most, so it is refreshed at its own
+    slower pace, retried sooner after a failure, without delaying the
+    real-time data.
+    """
+
+    def __init__(self, hass: HomeAssistant, client: Eco2mixApiClient) -> None:
+        """Initialize."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN}_forecast",
+            update_interval=FORECAST_REFRESH_INTERVAL,
+        )
+        self._client = client
+        self.write_stats = WriteStats()
+
+    async def _async_update_data(self) -> Eco2mixForecast:
+        """Fetch the forecast of the upcoming intervals."""
+        # Query from the current quarter-hour so the query can be cached
+        now = dt_util.utcnow()
+        since = now.replace(
+            minute=now.minute - now.minute % 15, second=0, microsecond=0
+        )
+        params = {
+            "select": ",".join(FORECAST_FIELDS),
+            "where": (
+                f"date_heure >= date'{since.isoformat()}'"
+                " and (prevision_j is not null or prevision_j1 is not null)"
+            ),
+            "order_by": "date_heure asc",
+            "limit": API_PAGE_SIZE,
         }
 
         try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-
-            if not data["results"]:
-                _LOGGER.error("No data available in API response")
-                return None
-
-            current_data = None
-            for entry in data["results"]:
-                if entry["consommation"] is not None:
-                    current_data = entry
-                    break
-
-            if not current_data:
-                _LOGGER.error("No valid data found in API response")
-                return None
-
-            return self._process_data(current_data)
-
-        except requests.exceptions.Timeout:
-            _LOGGER.error("API request timed out")
-            raise
-        except requests.exceptions.RequestException as err:
-            _LOGGER.error("API request failed: %s", err)
-            raise
-
-    def _process_data(self, current_data: dict[str, Any]) -> dict[str, Any]:
-        """Process the raw API data."""
-        processed_data = {
-            "consumption": current_data["consommation"],
-            "nuclear": current_data["nucleaire"],
-            "wind": current_data["eolien"],
-            "solar": current_data["solaire"],
-            "hydraulic": current_data["hydraulique"],
-            "bioenergy": current_data["bioenergies"],
-            "gas": current_data["gaz"],
-            "coal": current_data["charbon"],
-            "fuel": current_data["fioul"],
-            "timestamp": datetime.fromisoformat(current_data["date_heure"]),
-            "pumping": abs(current_data["pompage"]) if current_data["pompage"] else 0,
+            results = await self._client.async_get_records(NATIONAL_DATASET, params)
+        except Eco2mixApiError as err:
+            # The previous forecast is kept until the retry
+            self.update_interval = FORECAST_RETRY_INTERVAL
+            raise UpdateFailed(f"Forecast update failed: {err}") from err
+
+        self.update_interval = FORECAST_REFRESH_INTERVAL
+        return Eco2mixForecast(results)
+
+    def best_window(
+        self, duration: timedelta, horizon: timedelta
+    ) -> tuple[datetime, datetime, float] | None:
+        """Return the upcoming window with the lowest forecast consumption."""
+        if self.data is None:
+            return None
+        return self.data.best_window(duration, dt_util.utcnow(), horizon)
+
+
+class Eco2mixHistoryCoordinator(DataUpdateCoordinator[datetime | None]):
+    """Class to manage importing the past records in the statistics.
+
+    The records of the past days missing from the statistics are imported
+    daily, in the background of the real-time updates, and added to its
+    buffer and rolling statistics. The data is the last backfilled hour.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: Eco2mixApiClient,
+        realtime: Eco2mixDataUpdateCoordinator,
+        history: "Eco2mixHistory",
+        backfill_days: int,
+    ) -> None:
+        """Initialize."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN}_history",
+            update_interval=HISTORY_REFRESH_INTERVAL,
+        )
+        self._client = client
+        self._realtime = realtime
+        self._history = history
+        self._backfill_days = backfill_days
+
+    async def _async_update_data(self) -> datetime | None:
+        """Import the records of the past days missing from the statistics.
+
+        Records are streamed from a dataset export, oldest first, starting
+        after the last backfilled hour and going back at most the configured
+        number of days, and processed in batches as they are received.
+        """
+        start = dt_util.start_of_local_day() - timedelta(days=self._backfill_days)
+        # The polls import the latest hours meanwhile, so the start is the
+        # last hour backfilled, or else recorded at startup
+        if (last := self.data or self._history.recorded_until) is not None:
+            start = max(start, last + timedelta(hours=1))
+
+        params = {
+            "select": ",".join(NATIONAL_FIELDS),
+            "where": (
+                f"consommation is not null and date_heure >= date'{start.isoformat()}'"
+            ),
+            "order_by": "date_heure asc",
         }
 
-        total_production = sum(
-            processed_data[source]
-            for source in ALL_PRODUCTION_SOURCES
-            if processed_data.get(source) is not None
+        _LOGGER.debug("Backfilling statistics since %s", start)
+        batch: list[dict[str, Any]] = []
+        last_record: dict[str, Any] | None = None
+        try:
+            async for record in self._client.async_stream_records(
+                NATIONAL_DATASET, params
+            ):
+                batch.append(record)
+                if len(batch) == API_PAGE_SIZE:
+                    self._realtime.async_add_backfilled_records(batch)
+                    last_record = batch[-1]
+                    batch = []
+            if batch:
+                self._realtime.async_add_backfilled_records(batch)
+                last_record = batch[-1]
+        except Eco2mixApiError as err:
+            # The records received are kept, the rest is imported at the retry
+            self.update_interval = HISTORY_RETRY_INTERVAL
+            raise UpdateFailed(f"Statistics backfill stopped: {err}") from err
+
+        self.update_interval = HISTORY_REFRESH_INTERVAL
+        if last_record is None:
+            return self.data
+        # The last hour may not be complete yet, it is backfilled again
+        return datetime.fromisoformat(last_record["date_heure"]).replace(
+            minute=0, second=0, microsecond=0
+        ) - timedelta(hours=1)
+
+
+class Eco2mixRegionalCoordinator(DataUpdateCoordinator[dict[str, dict[str, Any]]]):
+    """Class to manage fetching the eco2mix data of several regions.
+
+    All regions are fetched with a single request per poll and the data is
+    a dict of processed records by region code.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: Eco2mixApiClient,
+        regions: list[str],
+        scan_interval: int,
+        max_scan_interval: int,
+        emission_factors: dict[str, float],
+    ) -> None:
+        """Initialize."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN}_regional",
+            update_interval=timedelta(minutes=scan_interval),
         )
-        processed_data["total_production"] = total_production
+        self._client = client
+        self._regions = regions
+        self._scheduler = PublicationScheduler(timedelta(minutes=max_scan_interval))
+        self._emission_factors = emission_factors
+        self._metrics = MetricSubscriptions()
+        self.write_stats = WriteStats()
+
+    @callback
+    def async_subscribe_metrics(self, metrics: Iterable[str]) -> CALLBACK_TYPE:
+        """Subscribe to processed metrics, computed until unsubscribed."""
+        unsubscribe = self._metrics.subscribe(metrics)
+        if self.data is not None:
+            self.data = {
+                region: add_metrics(
+                    record, self._metrics.metrics, self._emission_factors
+                )
+                for region, record in self.data.items()
+            }
+        return unsubscribe
 
-        exchanges = current_data.get("ech_physiques", 0)
-        processed_data["import"] = max(0, exchanges)
-        processed_data["export"] = abs(min(0, exchanges))
+    async def _async_update_data(self) -> dict[str, dict[str, Any]]:
+        """Fetch the latest data of the regions."""
+        data = dict(self.data or {})
+        previous = None
+        if all(region in data for region in self._regions):
+            previous = min(data[region]["timestamp"] for region in self._regions)
 
-        processed_data["renewable"] = sum(
-            processed_data[source]
-            for source in RENEWABLE_SOURCES
-            if processed_data.get(source) is not None
+        try:
+            records = await self._async_get_records(previous)
+        except Eco2mixApiError as err:
+            self._scheduler.record_miss()
+            self.update_interval = self._scheduler.next_interval(
+                previous, dt_util.utcnow()
+            )
+            raise UpdateFailed(f"API request failed: {err}") from err
+
+        for record in records:
+            region = record.pop("code_insee_region")
+            if region not in data or record["timestamp"] > data[region]["timestamp"]:
+                data[region] = record
+
+        latest = min(
+            (data[region]["timestamp"] for region in self._regions if region in data),
+            default=None,
         )
-        processed_data["low_carbon"] = sum(
-            processed_data[source]
-            for source in LOW_CARBON_SOURCES
-            if processed_data.get(source) is not None
+        if latest is None or latest == previous:
+            self._scheduler.record_miss(dt_util.utcnow())
+        elif previous is not None and latest - previous == PUBLICATION_PERIOD:
+            self._scheduler.record_publication(latest, dt_util.utcnow())
+        else:
+            self._scheduler.reset_misses()
+        self.update_interval = self._scheduler.next_interval(latest, dt_util.utcnow())
+
+        return data
+
+    async def _async_get_records(
+        self, previous: datetime | None
+    ) -> list[dict[str, Any]]:
+        """Get the processed records of the regions, newest first.
+
+        Until every region has data, the records of the last day are
+        fetched; later polls only ask for records newer than the oldest
+        latest record of the regions.
+        """
+        since = previous or dt_util.utcnow() - timedelta(days=1)
+        regions = " or ".join(
+            f"code_insee_region = '{region}'" for region in self._regions
         )
+        params = {
+            "select": ",".join(REGIONAL_FIELDS),
+            "where": (
+                f"({regions}) and consommation is not null"
+                f" and date_heure > date'{since.isoformat()}'"
+            ),
+            "order_by": "date_heure desc",
+            "limit": API_PAGE_SIZE,
+        }
 
-        total_production_mw = total_production
-        if total_production_mw > 0:
-            for source in ALL_PRODUCTION_SOURCES:
-                source_value_mw = (
-                    processed_data[source]
-                    if processed_data.get(source) is not None
-                    else 0
-                )
-                processed_data[f"{source}_percentage"] = (
-                    source_value_mw / total_production_mw * 100
-                )
-            processed_data["renewable_percentage"] = (
-                (processed_data["renewable"]) / total_production_mw * 100
-            )
-            processed_data["low_carbon_percentage"] = (
-                (processed_data["low_carbon"]) / total_production_mw * 100
-            )
+        results = await self._client.async_get_records(REGIONAL_DATASET, params)
+        records = process_records(
+            results, self._emission_factors, self._metrics.metrics
+        )
+        for result, record in zip(results, records, strict=True):
+            record["code_insee_region"] = result["code_insee_region"]
+        return records
 
-        return processed_data
 
-    @staticmethod
-    def _to_kw(value: float | None) -> float | None:
-        """Convert MW to kW."""
-        return value
+@dataclass
+class Eco2mixData:
+    """Runtime data of an éCO2mix config entry."""
+
+    coordinator: Eco2mixDataUpdateCoordinator
+    regional: Eco2mixRegionalCoordinator | None
+    # Time taken by the entry setup, until the platforms were set up
+    setup_duration: timedelta | None = None
@@ -0,0 +1,72 @@
+"""Diagnostics support for éCO2mix."""
+
+from dataclasses import asdict
+from datetime import timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from . import Eco2mixConfigEntry
+
+
+def _seconds(interval: timedelta | None) -> float | None:
+    """Return an interval in seconds."""
+    return interval.total_seconds() if interval is not None else None
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: Eco2mixConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = entry.runtime_data.coordinator
+    forecast = coordinator.forecast_coordinator
+    regional = entry.runtime_data.regional
+
+    diagnostics: dict[str, Any] = {
+        "options": dict(entry.options),
+        "setup_duration": _seconds(entry.runtime_data.setup_duration),
+        "api": coordinator.api_stats.as_dict(),
+        "circuit": coordinator.circuit_state,
+        "national": {
+            "last_update_success": coordinator.last_update_success,
+            "update_interval": _seconds(coordinator.update_interval),
+            "publication_lag": _seconds(coordinator.publication_lag),
+            "timestamp": coordinator.data["timestamp"] if coordinator.data else None,
+            "staleness": _seconds(coordinator.staleness),
+            "consecutive_failures": coordinator.consecutive_failures,
+            "last_successful_update": coordinator.last_successful_update,
+            "buffered_records": (
+                len(coordinator.buffer) if coordinator.buffer is not None else None
+            ),
+            "energy_intervals": len(coordinator.energy),
+            "thresholds": {
+                threshold.threshold_id: threshold.above
+                for threshold in coordinator.thresholds
+            },
+            "metrics": sorted(coordinator.metrics),
+            "writes": asdict(coordinator.write_stats),
+        },
+        "forecast": {
+            "last_update_success": forecast.last_update_success,
+            "update_interval": _seconds(forecast.update_interval),
+            "intervals": len(forecast.data or ()),
+            "writes": asdict(forecast.write_stats),
+        },
+    }
+    if (history := coordinator.history_coordinator) is not None:
+        diagnostics["history"] = {
+            "last_update_success": history.last_update_success,
+            "update_interval": _seconds(history.update_interval),
+            "backfilled_until": history.data,
+        }
+    if regional is not None:
+        diagnostics["regional"] = {
+            "last_update_success": regional.last_update_success,
+            "update_interval": _seconds(regional.update_interval),
+            "timestamps": {
+                region: record["timestamp"]
+                for region, record in (regional.data or {}).items()
+            },
+            "writes": asdict(regional.write_stats),
+        }
+    return diagnostics
@@ -0,0 +1,119 @@
+"""Cumulated energy of the eco2mix power series."""
+
+from typing import Any
+
+from .const import ENERGY_WINDOW, PUBLICATION_PERIOD
+
+# Processed keys whose energy is cumulated, in MWh
+ENERGY_KEYS = [
+    "consumption",
+    "nuclear",
+    "wind",
+    "solar",
+    "hydraulic",
+    "bioenergy",
+    "gas",
+    "coal",
+    "fuel",
+    "total_production",
+    "pumping",
+    "import",
+    "export",
+]
+
+# Energy of one MW during a publication period, in MWh
+INTERVAL_HOURS = PUBLICATION_PERIOD.total_seconds() / 3600
+
+
+class Eco2mixEnergy:
+    """Energy of the quarter-hour power series, cumulated since the start.
+
+    The totals are those of TOTAL_INCREASING sensors, whose increases are
+    booked in the hour they are seen. Only the intervals newer than the
+    last counted one are added, starting from the latest interval of the
+    first records: late intervals, like those of a backfill, are left to
+    the hourly energy statistics, which book them at their own hour. A
+    revised interval adds the difference with the values it was counted
+    with. As the totals must never decrease, a downward revision is
+    deducted from the next increases instead. Intervals are remembered
+    for ENERGY_WINDOW; the values of the intervals counted before a
+    restart are not persisted, so their revisions are ignored.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.totals = dict.fromkeys(ENERGY_KEYS, 0.0)
+        self._deferred = dict.fromkeys(ENERGY_KEYS, 0.0)
+        # Values each interval was counted with, by epoch timestamp
+        self._intervals: dict[int, list[float] | None] = {}
+        self._latest = 0
+
+    def __len__(self) -> int:
+        """Return the number of remembered intervals."""
+        return len(self._intervals)
+
+    def add_records(self, records: list[dict[str, Any]]) -> bool:
+        """Count the energy of processed records, return if totals changed."""
+        records = sorted(records, key=lambda record: record["timestamp"])
+        if records and not self._latest:
+            # The totals start with the latest interval
+            records = records[-1:]
+
+        changed = False
+        for record in records:
+            timestamp = int(record["timestamp"].timestamp())
+            values = [record.get(key) or 0 for key in ENERGY_KEYS]
+            if timestamp in self._intervals:
+                counted = self._intervals[timestamp]
+                if counted is None or counted == values:
+                    # Counted before a restart, or unchanged
+                    continue
+            elif timestamp > self._latest:
+                counted = [0.0] * len(ENERGY_KEYS)
+                self._latest = timestamp
+            else:
+                # Late interval, older than the last counted
+                continue
+            self._intervals[timestamp] = values
+
+            for key, value, previous in zip(ENERGY_KEYS, values, counted, strict=True):
+                amount = (value - previous) * INTERVAL_HOURS + self._deferred[key]
+                if amount >= 0:
+                    self.totals[key] += amount
+                    self._deferred[key] = 0.0
+                else:
+                    self._deferred[key] = amount
+            changed = True
+
+        self._prune()
+        return changed
+
+    def _prune(self) -> None:
+        """Forget the intervals older than the window."""
+        oldest = self._latest - ENERGY_WINDOW.total_seconds()
+        if self._intervals and min(self._intervals) < oldest:
+            self._intervals = {
+                timestamp: values
+                for timestamp, values in self._intervals.items()
+                if timestamp >= oldest
+            }
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state to persist."""
+        return {
+            "keys": ENERGY_KEYS,
+            "totals": [self.totals[key] for key in ENERGY_KEYS],
+            "deferred": [self._deferred[key] for key in ENERGY_KEYS],
+            "intervals": sorted(self._intervals),
+        }
+
+    def restore(self, data: dict[str, Any]) -> None:
+        """Restore a persisted state."""
+        for key, total, deferred in zip(
+            data["keys"], data["totals"], data["deferred"], strict=True
+        ):
+            if key in self.totals:
+                self.totals[key] = total
+                self._deferred[key] = deferred
+        self._intervals = dict.fromkeys(data["intervals"])
+        self._latest = max(self._intervals, default=0)
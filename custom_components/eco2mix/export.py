@@ -0,0 +1,195 @@
+"""Export of the consolidated eco2mix history to compressed CSV files."""
+
+import asyncio
+import csv
+from datetime import date, datetime, time, timedelta
+import gzip
+import io
+import logging
+from pathlib import Path
+import shutil
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .api import Eco2mixApiClient
+from .const import (
+    API_PAGE_SIZE,
+    CONSOLIDATED_DATASET,
+    EXPORT_CONCURRENCY,
+    NATIONAL_FIELDS,
+    TIME_ZONE,
+)
+from .processing import METRICS, process_records
+
+_LOGGER = logging.getLogger(__name__)
+
+# Columns of the exported files, the processed metrics
+EXPORT_COLUMNS = ["timestamp", *sorted(METRICS - {"timestamp"})]
+
+
+def export_parts(start: date, end: date) -> list[tuple[date, date]]:
+    """Split a range of days, end excluded, into calendar months."""
+    parts = []
+    while start < end:
+        month_end = (start.replace(day=1) + timedelta(days=32)).replace(day=1)
+        parts.append((start, min(month_end, end)))
+        start = month_end
+    return parts
+
+
+def _csv_row(record: dict[str, Any]) -> list[Any]:
+    """Return the row of a processed record, missing values being empty."""
+    return [
+        record["timestamp"].isoformat(),
+        *(
+            "" if record.get(column) is None else record[column]
+            for column in EXPORT_COLUMNS[1:]
+        ),
+    ]
+
+
+class Eco2mixExport:
+    """Export of a range of days to a gzip compressed CSV file.
+
+    The range is split into months, downloaded EXPORT_CONCURRENCY at a
+    time from the consolidated dataset, and streamed to a compressed part
+    file each, in a directory next to the destination. A part is renamed
+    once complete, so an export which failed or was interrupted resumes
+    with the missing parts when run again. The parts are then joined into
+    the destination, as gzip files can be concatenated, and removed.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: Eco2mixApiClient,
+        emission_factors: dict[str, float],
+        path: Path,
+    ) -> None:
+        """Initialize."""
+        self._hass = hass
+        self._client = client
+        self._emission_factors = emission_factors
+        self._path = path
+        self._parts_path = path.with_name(f"{path.name}.parts")
+
+    async def async_export(self, start: date, end: date) -> dict[str, Any]:
+        """Export the days from start to end excluded, return a summary."""
+        parts = [
+            (self._parts_path / f"{first}_{last}.csv.gz", first, last)
+            for first, last in export_parts(start, end)
+        ]
+        missing = await self._hass.async_add_executor_job(self._missing_parts, parts)
+        if len(missing) < len(parts):
+            _LOGGER.debug(
+                "Resuming the export to %s, %d of %d parts done",
+                self._path,
+                len(parts) - len(missing),
+                len(parts),
+            )
+
+        semaphore = asyncio.Semaphore(EXPORT_CONCURRENCY)
+
+        async def async_export_part(path: Path, first: date, last: date) -> int:
+            async with semaphore:
+                return await self._async_export_part(path, first, last)
+
+        # Completed parts are kept if another one fails
+        counts = await asyncio.gather(
+            *(async_export_part(*part) for part in missing), return_exceptions=True
+        )
+        for count in counts:
+            if isinstance(count, BaseException):
+                raise count
+
+        # The records of the parts exported by a previous run are counted too
+        resumed = [part[0] for part in parts if part not in missing]
+        resumed_count = await self._hass.async_add_executor_job(
+            self._count_records, resumed
+        )
+        await self._hass.async_add_executor_job(
+            self._join_parts, [path for path, _, _ in parts]
+        )
+        return {
+            "path": str(self._path),
+            "parts": len(parts),
+            "resumed_parts": len(resumed),
+            "records": sum(counts) + resumed_count,
+        }
+
+    async def _async_export_part(self, path: Path, first: date, last: date) -> int:
+        """Stream the records of a part to its file, return their number."""
+        time_zone = dt_util.get_time_zone(TIME_ZONE)
+        since = datetime.combine(first, time(), time_zone)
+        until = datetime.combine(last, time(), time_zone)
+        params = {
+            "select": ",".join(NATIONAL_FIELDS),
+            "where": (
+                "consommation is not null"
+                f" and date_heure >= date'{since.isoformat()}'"
+                f" and date_heure < date'{until.isoformat()}'"
+            ),
+            "order_by": "date_heure asc",
+        }
+
+        partial = path.with_suffix(".tmp")
+        file = await self._hass.async_add_executor_job(
+            lambda: gzip.open(partial, "wt", newline="", encoding="utf-8")  # noqa: SIM115
+        )
+        writer = csv.writer(file)
+        count = 0
+        try:
+            batch: list[dict[str, Any]] = []
+            async for record in self._client.async_stream_records(
+                CONSOLIDATED_DATASET, params
+            ):
+                batch.append(record)
+                if len(batch) == API_PAGE_SIZE:
+                    count += await self._async_write(writer, batch)
+                    batch = []
+            count += await self._async_write(writer, batch)
+        finally:
+            await self._hass.async_add_executor_job(file.close)
+
+        await self._hass.async_add_executor_job(partial.replace, path)
+        _LOGGER.debug("Exported %d records from %s to %s", count, first, last)
+        return count
+
+    async def _async_write(self, writer: Any, results: list[dict[str, Any]]) -> int:
+        """Process and write a batch of records, return their number."""
+        records = process_records(results, self._emission_factors, METRICS)
+        await self._hass.async_add_executor_job(
+            writer.writerows, [_csv_row(record) for record in records]
+        )
+        return len(records)
+
+    def _missing_parts(
+        self, parts: list[tuple[Path, date, date]]
+    ) -> list[tuple[Path, date, date]]:
+        """Return the parts not exported yet, creating their directory."""
+        self._parts_path.mkdir(parents=True, exist_ok=True)
+        return [part for part in parts if not part[0].exists()]
+
+    @staticmethod
+    def _count_records(paths: list[Path]) -> int:
+        """Return the number of records of parts exported by a previous run."""
+        count = 0
+        for path in paths:
+            with gzip.open(path, "rt", newline="", encoding="utf-8") as file:
+                count += sum(1 for _ in csv.reader(file))
+        return count
+
+    def _join_parts(self, paths: list[Path]) -> None:
+        """Join the header and the parts into the destination file."""
+        header = io.StringIO()
+        csv.writer(header).writerow(EXPORT_COLUMNS)
+        partial = self._path.with_name(f"{self._path.name}.tmp")
+        with partial.open("wb") as file:
+            file.write(gzip.compress(header.getvalue().encode()))
+            for path in paths:
+                with path.open("rb") as part:
+                    shutil.copyfileobj(part, file)
+        partial.replace(self._path)
+        shutil.rmtree(self._parts_path)
@@ -0,0 +1,96 @@
+"""Consumption forecast of the upcoming eco2mix intervals."""
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from itertools import accumulate
+import math
+from typing import Any
+
+from .const import PUBLICATION_PERIOD
+
+
+class Eco2mixForecast:
+    """Forecast consumption of the upcoming quarter-hours.
+
+    The best window of a given duration is the one with the lowest average
+    forecast consumption, when peaks are covered by fossil plants. For each
+    window duration, window averages are indexed once in a sparse table,
+    after which any horizon is answered with a bisect and a constant time
+    range minimum lookup.
+    """
+
+    def __init__(self, records: list[dict[str, Any]]) -> None:
+        """Initialize from API records sorted by date_heure."""
+        self._starts: list[datetime] = []
+        self._values: list[float] = []
+        for record in records:
+            value = record["prevision_j"]
+            if value is None:
+                value = record["prevision_j1"]
+            if value is not None:
+                self._starts.append(datetime.fromisoformat(record["date_heure"]))
+                self._values.append(value)
+        self._prefix = [0, *accumulate(self._values)]
+        self._tables: dict[int, tuple[list[float], list[list[int]]]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of forecast intervals."""
+        return len(self._values)
+
+    def best_window(
+        self, duration: timedelta, start: datetime, horizon: timedelta
+    ) -> tuple[datetime, datetime, float] | None:
+        """Return the best window starting after start and ending in horizon.
+
+        The result is the start, end and average forecast consumption of
+        the window, or None if the forecast doesn't cover such a window.
+        """
+        size = max(1, math.ceil(duration / PUBLICATION_PERIOD))
+        if size > len(self._values):
+            return None
+
+        first = bisect_left(self._starts, start)
+        last = min(
+            bisect_right(self._starts, start + horizon - size * PUBLICATION_PERIOD),
+            len(self._values) - size + 1,
+        )
+        if first >= last:
+            return None
+
+        means, table = self._table(size)
+        level = (last - first).bit_length() - 1
+        index = min(
+            table[level][first],
+            table[level][last - (1 << level)],
+            key=lambda index: (means[index], index),
+        )
+        return (
+            self._starts[index],
+            self._starts[index] + size * PUBLICATION_PERIOD,
+            means[index],
+        )
+
+    def _table(self, size: int) -> tuple[list[float], list[list[int]]]:
+        """Return the window averages and their range minimum sparse table."""
+        if size not in self._tables:
+            means = [
+                (self._prefix[index + size] - self._prefix[index]) / size
+                for index in range(len(self._values) - size + 1)
+            ]
+            table = [list(range(len(means)))]
+            span = 1
+            while span * 2 <= len(means):
+                previous = table[-1]
+                table.append(
+                    [
+                        min(
+                            previous[index],
+                            previous[index + span],
+                            key=lambda index: (means[index], index),
+                        )
+                        for index in range(len(means) - span * 2 + 1)
+                    ]
+                )
+                span *= 2
+            self._tables[size] = (means, table)
+        return self._tables[size]
@@ -0,0 +1,269 @@
+"""Long-term statistics import for eco2mix."""
+
+from datetime import UTC, datetime, timedelta
+import logging
+from typing import Any
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import (
+    StatisticData,
+    StatisticMeanType,
+    StatisticMetaData,
+)
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+)
+from homeassistant.const import PERCENTAGE, UnitOfEnergy, UnitOfPower
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+from homeassistant.util.unit_conversion import EnergyConverter, PowerConverter
+
+from .const import CARBON_INTENSITY, DOMAIN, ENERGY_WINDOW, PUBLICATION_PERIOD
+from .energy import ENERGY_KEYS, INTERVAL_HOURS
+
+_LOGGER = logging.getLogger(__name__)
+
+# Processed keys imported as external statistics, with their unit
+HISTORY_KEYS = {
+    "consumption": UnitOfPower.MEGA_WATT,
+    "nuclear": UnitOfPower.MEGA_WATT,
+    "wind": UnitOfPower.MEGA_WATT,
+    "solar": UnitOfPower.MEGA_WATT,
+    "hydraulic": UnitOfPower.MEGA_WATT,
+    "bioenergy": UnitOfPower.MEGA_WATT,
+    "gas": UnitOfPower.MEGA_WATT,
+    "coal": UnitOfPower.MEGA_WATT,
+    "fuel": UnitOfPower.MEGA_WATT,
+    "total_production": UnitOfPower.MEGA_WATT,
+    "renewable": UnitOfPower.MEGA_WATT,
+    "low_carbon": UnitOfPower.MEGA_WATT,
+    "pumping": UnitOfPower.MEGA_WATT,
+    "import": UnitOfPower.MEGA_WATT,
+    "export": UnitOfPower.MEGA_WATT,
+    "renewable_percentage": PERCENTAGE,
+    "low_carbon_percentage": PERCENTAGE,
+    "carbon_intensity": CARBON_INTENSITY,
+}
+
+HOUR = timedelta(hours=1)
+RECORDS_PER_HOUR = HOUR // PUBLICATION_PERIOD
+
+
+def statistic_id(key: str) -> str:
+    """Return the external statistic id of a processed key."""
+    return f"{DOMAIN}:{key}"
+
+
+def energy_statistic_id(key: str) -> str:
+    """Return the external statistic id of the energy of a processed key."""
+    return statistic_id(f"{key}_energy")
+
+
+class Eco2mixHistory:
+    """Import eco2mix records into the recorder long-term statistics.
+
+    Records are grouped by hour and an hour is imported once all its
+    quarter-hour records have been seen: an hour partly polled after a
+    restart is left to the backfill, or dropped if it never completes.
+    Hours that were in the recorder at startup or imported since are
+    skipped, so the same record can be fed several times (by polls and by
+    a backfill) without being imported twice, and in any order: a poll
+    importing the latest hours doesn't hide the older hours a backfill is
+    still to import.
+
+    The energy of the power series is imported as hourly sums, each hour
+    being booked at its own start in the Energy dashboard, even when it
+    arrives late.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize."""
+        self._hass = hass
+        self._recorded_until: datetime | None = None
+        self._imported: set[datetime] = set()
+        self._latest: datetime | None = None
+        self._pending: dict[datetime, dict[datetime, dict[str, Any]]] = {}
+        # Energy sums at the end of the recorded hours, by hour start
+        self._sums: dict[datetime, list[float]] = {}
+
+    @property
+    def recorded_until(self) -> datetime | None:
+        """Return the start of the last hour in the recorder at startup."""
+        return self._recorded_until
+
+    async def async_load(self) -> None:
+        """Load the last recorded hour and energy sums from the recorder."""
+        last_stats = await get_instance(self._hass).async_add_executor_job(
+            self._get_last_statistics
+        )
+        stat_id = statistic_id(next(iter(HISTORY_KEYS)))
+        if last_stats.get(stat_id):
+            self._recorded_until = dt_util.utc_from_timestamp(
+                last_stats[stat_id][0]["start"]
+            )
+            _LOGGER.debug("Statistics recorded up to %s", self._recorded_until)
+
+        if energy_stats := last_stats.get(energy_statistic_id(ENERGY_KEYS[0])):
+            last_hour = dt_util.utc_from_timestamp(energy_stats[0]["start"])
+            self._sums[last_hour] = [
+                (last_stats.get(energy_statistic_id(key)) or [{}])[0].get("sum") or 0.0
+                for key in ENERGY_KEYS
+            ]
+
+    def _get_last_statistics(self) -> dict[str, list[dict[str, Any]]]:
+        """Return the last statistic of the first key and of the energies."""
+        last_stats = get_last_statistics(
+            self._hass, 1, statistic_id(next(iter(HISTORY_KEYS))), True, {"start"}
+        )
+        for key in ENERGY_KEYS:
+            last_stats.update(
+                get_last_statistics(
+                    self._hass, 1, energy_statistic_id(key), True, {"sum"}
+                )
+            )
+        return last_stats
+
+    def _is_imported(self, hour: datetime) -> bool:
+        """Return whether an hour is in the recorder."""
+        return hour in self._imported or (
+            self._recorded_until is not None and hour <= self._recorded_until
+        )
+
+    @callback
+    def async_add_records(self, records: list[dict[str, Any]]) -> None:
+        """Queue processed records and import the hours they complete."""
+        for record in records:
+            timestamp = record["timestamp"].astimezone(UTC)
+            hour = timestamp.replace(minute=0, second=0, microsecond=0)
+            if self._is_imported(hour):
+                continue
+            self._pending.setdefault(hour, {})[timestamp] = record
+            if self._latest is None or timestamp > self._latest:
+                self._latest = timestamp
+
+        if self._latest is None:
+            return
+
+        # Hours missing records for too long are never complete
+        expired = self._latest - ENERGY_WINDOW
+        for hour in [hour for hour in self._pending if hour < expired]:
+            del self._pending[hour]
+        self._imported = {hour for hour in self._imported if hour >= expired}
+        # The sums of the last expired hour are kept for the hours after it
+        if len(self._sums) > 1 and min(self._sums) < expired:
+            anchor = max((hour for hour in self._sums if hour < expired), default=None)
+            self._sums = {
+                hour: sums
+                for hour, sums in self._sums.items()
+                if hour >= expired or hour == anchor
+            }
+
+        complete = sorted(
+            hour
+            for hour, hour_records in self._pending.items()
+            if len(hour_records) == RECORDS_PER_HOUR
+        )
+        if not complete:
+            return
+
+        hours = [(hour, list(self._pending.pop(hour).values())) for hour in complete]
+        for key, unit in HISTORY_KEYS.items():
+            statistics = []
+            for hour, hour_records in hours:
+                values = [
+                    record[key]
+                    for record in hour_records
+                    if record.get(key) is not None
+                ]
+                if values:
+                    statistics.append(
+                        StatisticData(
+                            start=hour,
+                            mean=sum(values) / len(values),
+                            min=min(values),
+                            max=max(values),
+                        )
+                    )
+            if not statistics:
+                continue
+            async_add_external_statistics(
+                self._hass,
+                StatisticMetaData(
+                    mean_type=StatisticMeanType.ARITHMETIC,
+                    has_sum=False,
+                    name=f"éCO2mix {key.replace('_', ' ')}",
+                    source=DOMAIN,
+                    statistic_id=statistic_id(key),
+                    unit_class=(
+                        PowerConverter.UNIT_CLASS
+                        if unit == UnitOfPower.MEGA_WATT
+                        else None
+                    ),
+                    unit_of_measurement=unit,
+                ),
+                statistics,
+            )
+
+        self._async_import_energy(hours)
+        self._imported.update(complete)
+        _LOGGER.debug("Imported statistics from %s to %s", complete[0], complete[-1])
+
+    @callback
+    def _async_import_energy(
+        self, hours: list[tuple[datetime, list[dict[str, Any]]]]
+    ) -> None:
+        """Import the energy of complete hours as hourly sums.
+
+        An hour older than hours already imported, like one backfilled
+        after the polls went on, starts from the sums of the hour before it,
+        and its energy is added to the sums of the hours after it.
+        """
+        recorder = get_instance(self._hass)
+        statistics: dict[str, list[StatisticData]] = {key: [] for key in ENERGY_KEYS}
+        for hour, hour_records in hours:
+            energies = [
+                sum(record.get(key) or 0 for record in hour_records) * INTERVAL_HOURS
+                for key in ENERGY_KEYS
+            ]
+            before = max((known for known in self._sums if known < hour), default=None)
+            sums = self._sums[before] if before is not None else [0.0] * len(energies)
+            self._sums[hour] = [
+                total + energy for total, energy in zip(sums, energies, strict=True)
+            ]
+            for key, total in zip(ENERGY_KEYS, self._sums[hour], strict=True):
+                statistics[key].append(
+                    StatisticData(start=hour, state=total, sum=total)
+                )
+
+            later = [known for known in self._sums if known > hour]
+            if not later:
+                continue
+            for known in later:
+                self._sums[known] = [
+                    total + energy
+                    for total, energy in zip(self._sums[known], energies, strict=True)
+                ]
+            for key, energy in zip(ENERGY_KEYS, energies, strict=True):
+                if energy:
+                    recorder.async_adjust_statistics(
+                        energy_statistic_id(key),
+                        hour + HOUR,
+                        energy,
+                        UnitOfEnergy.MEGA_WATT_HOUR,
+                    )
+
+        for key, key_statistics in statistics.items():
+            async_add_external_statistics(
+                self._hass,
+                StatisticMetaData(
+                    mean_type=StatisticMeanType.NONE,
+                    has_sum=True,
+                    name=f"éCO2mix {key.replace('_', ' ')} energy",
+                    source=DOMAIN,
+                    statistic_id=energy_statistic_id(key),
+                    unit_class=EnergyConverter.UNIT_CLASS,
+                    unit_of_measurement=UnitOfEnergy.MEGA_WATT_HOUR,
+                ),
+                key_statistics,
+            )
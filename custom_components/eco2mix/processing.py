@@ -0,0 +1,239 @@
+"""Processing of eco2mix API records."""
+
+from collections import Counter
+from collections.abc import Callable, Iterable
+from datetime import datetime
+from typing import Any
+
+from .const import (
+    ALL_PRODUCTION_SOURCES,
+    DEFAULT_EMISSION_FACTORS,
+    LOW_CARBON_SOURCES,
+    RENEWABLE_SOURCES,
+)
+
+# API field of each production source
+SOURCE_FIELDS = {
+    "nuclear": "nucleaire",
+    "wind": "eolien",
+    "solar": "solaire",
+    "hydraulic": "hydraulique",
+    "bioenergy": "bioenergies",
+    "gas": "gaz",
+    "coal": "charbon",
+    "fuel": "fioul",
+    "thermal": "thermique",
+}
+
+# Position of each source in the source columns
+SOURCE_INDEX = {source: index for index, source in enumerate(ALL_PRODUCTION_SOURCES)}
+RENEWABLE_INDEXES = [SOURCE_INDEX[source] for source in RENEWABLE_SOURCES]
+LOW_CARBON_INDEXES = [SOURCE_INDEX[source] for source in LOW_CARBON_SOURCES]
+
+# Metrics read from the API records
+BASE_METRICS = {
+    "consumption",
+    "timestamp",
+    "pumping",
+    "import",
+    "export",
+    *ALL_PRODUCTION_SOURCES,
+}
+
+# Metrics computed from other metrics, with the metrics they depend on
+METRIC_DEPENDENCIES = {
+    "total_production": set(ALL_PRODUCTION_SOURCES),
+    "renewable": set(RENEWABLE_SOURCES),
+    "low_carbon": set(LOW_CARBON_SOURCES),
+    "renewable_percentage": {"renewable", "total_production"},
+    "low_carbon_percentage": {"low_carbon", "total_production"},
+    "carbon_intensity": {*ALL_PRODUCTION_SOURCES, "total_production"},
+    **{
+        f"{source}_percentage": {source, "total_production"}
+        for source in ALL_PRODUCTION_SOURCES
+    },
+}
+
+# All the processed metrics
+METRICS = BASE_METRICS | METRIC_DEPENDENCIES.keys()
+
+
+def _sum_columns(columns: list[list[float]], indexes: list[int]) -> list[float]:
+    """Return the element-wise sum of the selected columns."""
+    return list(map(sum, zip(*(columns[index] for index in indexes), strict=True)))
+
+
+def _percentages(
+    values: list[float | None], ratios: list[float | None]
+) -> list[float | None]:
+    """Return the values as a percentage of the total production."""
+    return [
+        None if ratio is None or value is None else value * ratio
+        for value, ratio in zip(values, ratios, strict=True)
+    ]
+
+
+def _carbon_intensity(
+    sources: list[list[float]],
+    ratios: list[float | None],
+    emission_factors: dict[str, float],
+) -> list[float | None]:
+    """Return the carbon intensity of the production, in gCO2eq/kWh."""
+    weighted = [
+        [value * emission_factors[source] for value in sources[SOURCE_INDEX[source]]]
+        for source in ALL_PRODUCTION_SOURCES
+        if emission_factors.get(source)
+    ]
+    emissions = list(map(sum, zip(*weighted))) if weighted else [0] * len(ratios)
+    return [
+        None if ratio is None else emission * ratio / 100
+        for emission, ratio in zip(emissions, ratios, strict=True)
+    ]
+
+
+def _read_columns(records: list[dict[str, Any]]) -> dict[str, list[Any]]:
+    """Read the base metrics of raw API records into columns."""
+    exchanges = [record.get("ech_physiques") or 0 for record in records]
+    columns: dict[str, list[Any]] = {
+        "consumption": [record["consommation"] for record in records],
+        "timestamp": [
+            datetime.fromisoformat(record["date_heure"]) for record in records
+        ],
+        "pumping": [abs(record["pompage"] or 0) for record in records],
+        "import": [max(0, exchange) for exchange in exchanges],
+        "export": [abs(min(0, exchange)) for exchange in exchanges],
+    }
+    for source in ALL_PRODUCTION_SOURCES:
+        columns[source] = [record.get(SOURCE_FIELDS[source]) for record in records]
+    return columns
+
+
+def resolve_metrics(metrics: Iterable[str]) -> set[str]:
+    """Return the metrics along with the derived metrics they depend on."""
+    resolved: set[str] = set()
+    pending = list(metrics)
+    while pending:
+        metric = pending.pop()
+        if metric not in resolved:
+            resolved.add(metric)
+            pending.extend(METRIC_DEPENDENCIES.get(metric, ()))
+    return resolved & METRICS
+
+
+def _derive_columns(
+    columns: dict[str, list[Any]],
+    metrics: set[str],
+    emission_factors: dict[str, float] | None,
+) -> None:
+    """Add the missing derived metrics to columns of base metrics."""
+    missing = metrics - columns.keys()
+    if not missing:
+        return
+
+    sources = [
+        [0 if value is None else value for value in columns[source]]
+        for source in ALL_PRODUCTION_SOURCES
+    ]
+    if "total_production" not in columns:
+        columns["total_production"] = _sum_columns(sources, list(SOURCE_INDEX.values()))
+    ratios = [
+        100 / total if total > 0 else None for total in columns["total_production"]
+    ]
+
+    if "renewable" in missing:
+        columns["renewable"] = _sum_columns(sources, RENEWABLE_INDEXES)
+    if "low_carbon" in missing:
+        columns["low_carbon"] = _sum_columns(sources, LOW_CARBON_INDEXES)
+    for metric in ("renewable", "low_carbon", *ALL_PRODUCTION_SOURCES):
+        if f"{metric}_percentage" in missing:
+            columns[f"{metric}_percentage"] = _percentages(columns[metric], ratios)
+    if "carbon_intensity" in missing:
+        columns["carbon_intensity"] = _carbon_intensity(
+            sources, ratios, emission_factors or DEFAULT_EMISSION_FACTORS
+        )
+
+
+def process_columns(
+    records: list[dict[str, Any]],
+    emission_factors: dict[str, float] | None = None,
+    metrics: Iterable[str] | None = None,
+) -> dict[str, list[Any]]:
+    """Process raw API records into columns of values.
+
+    Each source is read once into a column, then totals, aggregates and
+    percentages are computed column by column. Missing source values stay
+    None in their own column and percentage, but count as 0 in the
+    aggregates. Percentages are None when there is no production. The carbon
+    intensity uses the given emission factors, defaulting to RTE's.
+
+    The base metrics are always read; derived metrics are only computed
+    when given in metrics, or needed by one of them. All metrics are
+    computed when metrics is None.
+    """
+    columns = _read_columns(records)
+    _derive_columns(
+        columns,
+        METRICS if metrics is None else resolve_metrics(metrics),
+        emission_factors,
+    )
+    return columns
+
+
+def process_records(
+    records: list[dict[str, Any]],
+    emission_factors: dict[str, float] | None = None,
+    metrics: Iterable[str] | None = None,
+) -> list[dict[str, Any]]:
+    """Process raw API records into one dict of values per record."""
+    if not records:
+        return []
+    columns = process_columns(records, emission_factors, metrics)
+    keys = list(columns)
+    return [dict(zip(keys, values)) for values in zip(*columns.values())]
+
+
+def add_metrics(
+    record: dict[str, Any],
+    metrics: Iterable[str],
+    emission_factors: dict[str, float] | None = None,
+) -> dict[str, Any]:
+    """Return a processed record completed with the given metrics."""
+    columns = {key: [value] for key, value in record.items()}
+    _derive_columns(columns, resolve_metrics(metrics), emission_factors)
+    return {key: column[0] for key, column in columns.items()}
+
+
+class MetricSubscriptions:
+    """Metrics subscribed by the consumers of the processed records.
+
+    A metric is computed as long as one consumer is subscribed to it, the
+    required metrics being always computed.
+    """
+
+    def __init__(self, required: Iterable[str] = ()) -> None:
+        """Initialize."""
+        self._required = set(required)
+        self._counts: Counter[str] = Counter()
+        self._metrics = resolve_metrics(BASE_METRICS | self._required)
+
+    @property
+    def metrics(self) -> set[str]:
+        """Return the metrics to compute, with their dependencies."""
+        return self._metrics
+
+    def subscribe(self, metrics: Iterable[str]) -> Callable[[], None]:
+        """Subscribe to metrics and return a function to unsubscribe."""
+        metrics = set(metrics)
+        self._counts.update(metrics)
+        self._update()
+
+        def unsubscribe() -> None:
+            self._counts.subtract(metrics)
+            self._update()
+
+        return unsubscribe
+
+    def _update(self) -> None:
+        """Update the metrics to compute."""
+        subscribed = {metric for metric, count in self._counts.items() if count > 0}
+        self._metrics = resolve_metrics(BASE_METRICS | self._required | subscribed)
@@ -0,0 +1,209 @@
+"""Rolling statistics of the recent eco2mix intervals."""
+
+from datetime import datetime, timedelta
+import heapq
+import math
+import random
+from typing import Any
+
+from .const import PUBLICATION_PERIOD
+
+# Processed keys with rolling statistics
+ROLLING_KEYS = [
+    "consumption",
+    "renewable_percentage",
+    "low_carbon_percentage",
+    "carbon_intensity",
+]
+
+
+class _Node:
+    """Node of the skiplist, with the number of values each link skips."""
+
+    __slots__ = ("next", "value", "width")
+
+    def __init__(self, value: float, levels: int) -> None:
+        self.value = value
+        self.next: list[_Node] = [_TAIL] * levels
+        self.width = [1] * levels
+
+
+_TAIL = _Node.__new__(_Node)
+_TAIL.value = math.inf
+
+
+class SortedValues:
+    """Sorted multiset of floats, with O(log n) insertion, removal and rank.
+
+    This is an indexable skiplist: each link of a node knows how many
+    values it skips, so the value of a given rank is found by walking
+    down the levels like a value is.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize for about capacity values."""
+        self._levels = max(1, capacity.bit_length())
+        self._head = _Node(-math.inf, self._levels)
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Return the number of values."""
+        return self._size
+
+    def __getitem__(self, rank: int) -> float:
+        """Return the value of a rank, the smallest value being of rank 0."""
+        if not 0 <= rank < self._size:
+            raise IndexError(rank)
+        node = self._head
+        rank += 1
+        for level in reversed(range(self._levels)):
+            while node.width[level] <= rank:
+                rank -= node.width[level]
+                node = node.next[level]
+        return node.value
+
+    def add(self, value: float) -> None:
+        """Add a value."""
+        chain = [self._head] * self._levels
+        steps = [0] * self._levels
+        node = self._head
+        for level in reversed(range(self._levels)):
+            while node.next[level].value <= value:
+                steps[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+
+        levels = min(self._levels, 1 - int(math.log2(1 - random.random())))
+        new = _Node(value, levels)
+        skipped = 0
+        for level in range(levels):
+            previous = chain[level]
+            new.next[level] = previous.next[level]
+            previous.next[level] = new
+            new.width[level] = previous.width[level] - skipped
+            previous.width[level] = skipped + 1
+            skipped += steps[level]
+        for level in range(levels, self._levels):
+            chain[level].width[level] += 1
+        self._size += 1
+
+    def remove(self, value: float) -> None:
+        """Remove a value."""
+        chain = [self._head] * self._levels
+        node = self._head
+        for level in reversed(range(self._levels)):
+            while node.next[level].value < value:
+                node = node.next[level]
+            chain[level] = node
+        removed = chain[0].next[0]
+        if removed.value != value:
+            raise KeyError(value)
+
+        for level in range(len(removed.next)):
+            previous = chain[level]
+            previous.width[level] += removed.width[level] - 1
+            previous.next[level] = removed.next[level]
+        for level in range(len(removed.next), self._levels):
+            chain[level].width[level] -= 1
+        self._size -= 1
+
+
+class RollingStatistics:
+    """Minimum, maximum, mean and percentiles of a sliding time window.
+
+    The window ends at the most recent interval added. Adding an interval
+    and evicting the ones leaving the window take O(log n) each. A late
+    interval is added at its place if still within the window, and an
+    interval added again replaces its previous value.
+    """
+
+    def __init__(self, window: timedelta, capacity: int) -> None:
+        """Initialize for a window of about capacity intervals."""
+        self._window = window.total_seconds()
+        self._sorted = SortedValues(capacity)
+        self._values: dict[float, float] = {}
+        self._timestamps: list[float] = []
+        self._latest = -math.inf
+        self._sum = 0.0
+
+    def __len__(self) -> int:
+        """Return the number of intervals in the window."""
+        return len(self._sorted)
+
+    def add(self, timestamp: datetime, value: float | None) -> None:
+        """Add the value of an interval, ignoring missing values."""
+        if value is None or math.isnan(value):
+            return
+        epoch = timestamp.timestamp()
+        if epoch <= self._latest - self._window:
+            return
+
+        if (previous := self._values.get(epoch)) is not None:
+            self._sorted.remove(previous)
+            self._sum -= previous
+        else:
+            heapq.heappush(self._timestamps, epoch)
+        self._values[epoch] = value
+        self._sorted.add(value)
+        self._sum += value
+
+        if epoch > self._latest:
+            self._latest = epoch
+            while self._timestamps[0] <= epoch - self._window:
+                evicted = self._values.pop(heapq.heappop(self._timestamps))
+                self._sorted.remove(evicted)
+                self._sum -= evicted
+
+    @property
+    def minimum(self) -> float | None:
+        """Return the smallest value of the window."""
+        return self._sorted[0] if self._sorted else None
+
+    @property
+    def maximum(self) -> float | None:
+        """Return the largest value of the window."""
+        return self._sorted[len(self._sorted) - 1] if self._sorted else None
+
+    @property
+    def mean(self) -> float | None:
+        """Return the average value of the window."""
+        return self._sum / len(self._sorted) if self._sorted else None
+
+    def percentile(self, percent: float) -> float | None:
+        """Return a percentile of the window, interpolating between ranks."""
+        if not self._sorted:
+            return None
+        rank = percent / 100 * (len(self._sorted) - 1)
+        low = math.floor(rank)
+        high = math.ceil(rank)
+        return self._sorted[low] + (self._sorted[high] - self._sorted[low]) * (
+            rank - low
+        )
+
+
+class Eco2mixRolling:
+    """Rolling statistics of the processed records, for each window."""
+
+    def __init__(self, windows: list[int]) -> None:
+        """Initialize for windows given in hours."""
+        self.windows = {
+            hours: {
+                key: RollingStatistics(
+                    timedelta(hours=hours),
+                    int(timedelta(hours=hours) / PUBLICATION_PERIOD),
+                )
+                for key in ROLLING_KEYS
+            }
+            for hours in windows
+        }
+
+    def add_records(self, records: list[dict[str, Any]]) -> None:
+        """Add the values of processed records to the windows."""
+        for statistics in self.windows.values():
+            for key, rolling in statistics.items():
+                for record in records:
+                    rolling.add(record["timestamp"], record.get(key))
+
+    def get(self, key: str, hours: int) -> RollingStatistics:
+        """Return the statistics of a key over a window."""
+        return self.windows[hours][key]
@@ -0,0 +1,98 @@
+"""Adaptive polling scheduler for eco2mix."""
+
+from collections import deque
+from datetime import datetime, timedelta
+import random
+from statistics import median
+
+from .const import (
+    BACKOFF_JITTER,
+    DEFAULT_PUBLICATION_LAG,
+    MIN_SCAN_INTERVAL,
+    PUBLICATION_MARGIN,
+    PUBLICATION_PERIOD,
+)
+
+# Number of observed publication lags kept to estimate the next one
+LAG_SAMPLES = 16
+
+
+class PublicationScheduler:
+    """Compute when the next eco2mix record should be available.
+
+    RTE publishes a new record every quarter of an hour, some time after
+    the interval it describes. The scheduler learns that lag from the
+    records seen so far and aims the next poll just after the expected
+    publication. While data is late or the API fails, it backs off
+    exponentially with jitter, up to the configured maximum interval.
+
+    A record is only known to be published between the last poll that
+    didn't return it and the one that did. A record returned by the first
+    poll may have been published well before, so its lag is learnt a
+    margin earlier than the poll: the estimate then keeps going down until
+    a poll comes too early, and the polls that missed the record bound it
+    from below.
+    """
+
+    def __init__(self, max_interval: timedelta) -> None:
+        """Initialize."""
+        self._max_interval = max_interval
+        self._lags: deque[float] = deque(maxlen=LAG_SAMPLES)
+        self._misses = 0
+        self._unpublished_at: datetime | None = None
+
+    @property
+    def publication_lag(self) -> timedelta:
+        """Return the expected delay between a record and its publication."""
+        if not self._lags:
+            return DEFAULT_PUBLICATION_LAG
+        return timedelta(seconds=median(self._lags))
+
+    def record_publication(self, timestamp: datetime, seen_at: datetime) -> None:
+        """Learn the lag of a record first seen at the given time."""
+        lag = (seen_at - timestamp).total_seconds()
+        if self._unpublished_at is not None:
+            # Published between the last poll that missed it and this one
+            published = self._unpublished_at + (seen_at - self._unpublished_at) / 2
+            lag = (published - timestamp).total_seconds()
+        else:
+            lag -= 2 * PUBLICATION_MARGIN.total_seconds()
+        # Ignore lags that can't come from a regular publication
+        if 0 <= lag <= (self._max_interval + PUBLICATION_PERIOD).total_seconds():
+            self._lags.append(lag)
+        self.reset_misses()
+
+    def reset_misses(self) -> None:
+        """Record a successful poll that can't be used to learn the lag."""
+        self._misses = 0
+        self._unpublished_at = None
+
+    def record_miss(self, unpublished_at: datetime | None = None) -> None:
+        """Record a poll that failed or didn't return the expected record.
+
+        The time of a successful poll that didn't return the record is
+        given, the record being published after it.
+        """
+        self._misses += 1
+        if unpublished_at is not None:
+            self._unpublished_at = unpublished_at
+
+    def next_interval(
+        self, last_timestamp: datetime | None, now: datetime
+    ) -> timedelta:
+        """Return the delay before the next poll."""
+        if self._misses:
+            backoff = MIN_SCAN_INTERVAL * 2 ** (self._misses - 1)
+            backoff += backoff * random.uniform(0, BACKOFF_JITTER)
+            return min(backoff, self._max_interval)
+
+        if last_timestamp is None:
+            return MIN_SCAN_INTERVAL
+
+        expected = (
+            last_timestamp
+            + PUBLICATION_PERIOD
+            + self.publication_lag
+            + PUBLICATION_MARGIN
+        )
+        return min(max(expected - now, MIN_SCAN_INTERVAL), self._max_interval)
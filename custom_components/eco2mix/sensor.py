@@ -1,6 +1,8 @@
 """Support for éCO2mix sensors."""
 
-from dataclasses import dataclass
+from collections.abc import Callable
+from dataclasses import dataclass, replace
+from datetime import datetime
 import logging
 from typing import Any
 
@@ -10,16 +12,41 @@ from homeassistant.components.sensor import (
     SensorEntityDescription,
     SensorStateClass,
 )
-from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfPower
-from homeassistant.core import HomeAssistant
+from homeassistant.const import (
+    PERCENTAGE,
+    EntityCategory,
+    UnitOfEnergy,
+    UnitOfInformation,
+    UnitOfPower,
+    UnitOfTime,
+)
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_time_change
 from homeassistant.helpers.typing import StateType
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.helpers.update_coordinator import (
+    CoordinatorEntity,
+    DataUpdateCoordinator,
+)
 
 from . import Eco2mixConfigEntry
-from .const import DOMAIN
-from .coordinator import Eco2mixDataUpdateCoordinator
+from .const import (
+    CARBON_INTENSITY,
+    DEFAULT_WINDOW_DURATION,
+    DEFAULT_WINDOW_HORIZON,
+    DOMAIN,
+    CONF_REGIONS,
+    REGIONS,
+)
+from .coordinator import (
+    Eco2mixDataUpdateCoordinator,
+    Eco2mixForecastCoordinator,
+    Eco2mixRegionalCoordinator,
+)
+from .energy import ENERGY_KEYS
+from .processing import METRICS, add_metrics
+from .rolling import ROLLING_KEYS, RollingStatistics
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -28,6 +55,61 @@ _LOGGER = logging.getLogger(__name__)
 class Eco2mixSensorEntityDescription(SensorEntityDescription):
     """Describes Eco2mix sensor entity."""
 
+    value_fn: Callable[[Eco2mixDataUpdateCoordinator], StateType | datetime] | None = (
+        None
+    )
+    attr_fn: Callable[[Eco2mixDataUpdateCoordinator], dict[str, Any]] | None = None
+    # Available even when the data is outdated or the API unreachable
+    always_available: bool = False
+
+
+@dataclass(frozen=True, kw_only=True)
+class Eco2mixForecastSensorEntityDescription(SensorEntityDescription):
+    """Describes Eco2mix forecast sensor entity."""
+
+    value_fn: Callable[[Eco2mixForecastCoordinator], StateType | datetime]
+    attr_fn: Callable[[Eco2mixForecastCoordinator], dict[str, Any]] | None = None
+
+
+def _best_window_start(coordinator: Eco2mixForecastCoordinator) -> datetime | None:
+    """Return the start of the best upcoming window."""
+    window = coordinator.best_window(DEFAULT_WINDOW_DURATION, DEFAULT_WINDOW_HORIZON)
+    return window[0] if window else None
+
+
+def _best_window_attributes(
+    coordinator: Eco2mixForecastCoordinator,
+) -> dict[str, Any]:
+    """Return the end and average consumption of the best upcoming window."""
+    window = coordinator.best_window(DEFAULT_WINDOW_DURATION, DEFAULT_WINDOW_HORIZON)
+    if window is None:
+        return {}
+    return {"end": window[1], "average_consumption": window[2]}
+
+
+def _data_staleness(coordinator: Eco2mixDataUpdateCoordinator) -> float | None:
+    """Return the age of the data, in minutes."""
+    staleness = coordinator.staleness
+    return staleness.total_seconds() / 60 if staleness is not None else None
+
+
+def _api_latency(coordinator: Eco2mixDataUpdateCoordinator) -> float | None:
+    """Return the latency of the last API request, in milliseconds."""
+    latency = coordinator.api_stats.last_latency
+    return latency * 1000 if latency is not None else None
+
+
+def _rolling_attributes(rolling: RollingStatistics) -> dict[str, Any]:
+    """Return the statistics of a rolling window other than the median."""
+    return {
+        "min": rolling.minimum,
+        "max": rolling.maximum,
+        "mean": rolling.mean,
+        "p10": rolling.percentile(10),
+        "p90": rolling.percentile(90),
+        "count": len(rolling),
+    }
+
 
 ECO2MIX_SENSOR_TYPES: tuple[Eco2mixSensorEntityDescription, ...] = (
     Eco2mixSensorEntityDescription(
@@ -92,6 +174,13 @@ ECO2MIX_SENSOR_TYPES: tuple[Eco2mixSensorEntityDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         entity_registry_enabled_default=False,
     ),
+    Eco2mixSensorEntityDescription(
+        key="thermal",
+        translation_key="thermal",
+        native_unit_of_measurement=UnitOfPower.MEGA_WATT,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+    ),
     Eco2mixSensorEntityDescription(
         key="total_production",
         translation_key="total_production",
@@ -197,6 +286,14 @@ ECO2MIX_SENSOR_TYPES: tuple[Eco2mixSensorEntityDescription, ...] = (
         suggested_display_precision=2,
         entity_registry_enabled_default=False,
     ),
+    Eco2mixSensorEntityDescription(
+        key="thermal_percentage",
+        translation_key="thermal_percentage",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=2,
+        entity_registry_enabled_default=False,
+    ),
     Eco2mixSensorEntityDescription(
         key="renewable_percentage",
         translation_key="renewable_percentage",
@@ -211,15 +308,155 @@ ECO2MIX_SENSOR_TYPES: tuple[Eco2mixSensorEntityDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         suggested_display_precision=2,
     ),
+    Eco2mixSensorEntityDescription(
+        key="carbon_intensity",
+        translation_key="carbon_intensity",
+        native_unit_of_measurement=CARBON_INTENSITY,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+    ),
     Eco2mixSensorEntityDescription(
         key="timestamp",
         translation_key="timestamp",
         device_class=SensorDeviceClass.TIMESTAMP,
         entity_category=EntityCategory.DIAGNOSTIC,
     ),
+    Eco2mixSensorEntityDescription(
+        key="data_staleness",
+        translation_key="data_staleness",
+        always_available=True,
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=_data_staleness,
+    ),
+    Eco2mixSensorEntityDescription(
+        key="consecutive_failures",
+        translation_key="consecutive_failures",
+        always_available=True,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda coordinator: coordinator.consecutive_failures,
+    ),
+    Eco2mixSensorEntityDescription(
+        key="api_latency",
+        translation_key="api_latency",
+        always_available=True,
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=_api_latency,
+        attr_fn=lambda coordinator: {
+            "histogram": coordinator.api_stats.as_dict()["latency_histogram"]
+        },
+    ),
+    Eco2mixSensorEntityDescription(
+        key="api_cache_hit_rate",
+        translation_key="api_cache_hit_rate",
+        always_available=True,
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda coordinator: coordinator.api_stats.cache_hit_rate,
+    ),
+    Eco2mixSensorEntityDescription(
+        key="api_data_received",
+        translation_key="api_data_received",
+        always_available=True,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        suggested_unit_of_measurement=UnitOfInformation.KILOBYTES,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda coordinator: coordinator.api_stats.bytes_received,
+        attr_fn=lambda coordinator: {
+            "requests": coordinator.api_stats.requests,
+            "records": coordinator.api_stats.records_received,
+        },
+    ),
+)
+
+
+# Sensors of the consumption forecast
+FORECAST_SENSOR_TYPES: tuple[Eco2mixForecastSensorEntityDescription, ...] = (
+    Eco2mixForecastSensorEntityDescription(
+        key="best_window_start",
+        translation_key="best_window_start",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=_best_window_start,
+        attr_fn=_best_window_attributes,
+    ),
+)
+
+
+# Cumulated energy sensors, enabled by default like their power sensor
+ENERGY_SENSOR_TYPES: tuple[Eco2mixSensorEntityDescription, ...] = tuple(
+    Eco2mixSensorEntityDescription(
+        key=f"{key}_energy",
+        translation_key=f"{key}_energy",
+        device_class=SensorDeviceClass.ENERGY,
+        native_unit_of_measurement=UnitOfEnergy.MEGA_WATT_HOUR,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        suggested_display_precision=0,
+        entity_registry_enabled_default=key in ("consumption", "total_production"),
+        value_fn=lambda coordinator, key=key: coordinator.energy.totals[key],
+    )
+    for key in ENERGY_KEYS
 )
 
 
+def _rolling_sensor_types(
+    windows: list[int],
+) -> list[Eco2mixSensorEntityDescription]:
+    """Return the rolling median sensors of the configured windows."""
+    descriptions = {
+        description.key: description for description in ECO2MIX_SENSOR_TYPES
+    }
+    return [
+        replace(
+            descriptions[key],
+            key=f"{key}_rolling_{hours}h",
+            translation_key=f"{key}_rolling",
+            translation_placeholders={"hours": str(hours)},
+            entity_registry_enabled_default=True,
+            value_fn=lambda coordinator, key=key, hours=hours: coordinator.rolling.get(
+                key, hours
+            ).percentile(50),
+            attr_fn=lambda coordinator, key=key, hours=hours: _rolling_attributes(
+                coordinator.rolling.get(key, hours)
+            ),
+        )
+        for hours in windows
+        for key in ROLLING_KEYS
+    ]
+
+
+# Keys only available in the national dataset
+NATIONAL_ONLY_KEYS = {
+    "gas",
+    "coal",
+    "fuel",
+    "gas_percentage",
+    "coal_percentage",
+    "fuel_percentage",
+    "data_staleness",
+    "consecutive_failures",
+    "api_latency",
+    "api_cache_hit_rate",
+    "api_data_received",
+}
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: Eco2mixConfigEntry,
@@ -227,22 +464,78 @@ async def async_setup_entry(
 ) -> None:
     """Set up éco2mix sensor entities based on a config entry."""
 
-    coordinator = config_entry.runtime_data
+    coordinator = config_entry.runtime_data.coordinator
+    # Metrics are only computed once subscribed, complete the data to check them
+    data = add_metrics(coordinator.data, METRICS)
 
     async_add_entities(
         (
             Eco2mixSensor(coordinator, description)
-            for description in ECO2MIX_SENSOR_TYPES
-            if coordinator.data.get(description.key) is not None
+            for description in (
+                *ECO2MIX_SENSOR_TYPES,
+                *ENERGY_SENSOR_TYPES,
+                *_rolling_sensor_types(list(coordinator.rolling.windows)),
+            )
+            if description.value_fn is not None or data.get(description.key) is not None
         ),
         False,
     )
+    async_add_entities(
+        Eco2mixForecastSensor(coordinator.forecast_coordinator, description)
+        for description in FORECAST_SENSOR_TYPES
+    )
+
+    if (regional := config_entry.runtime_data.regional) is not None:
+        async_add_entities(
+            Eco2mixRegionalSensor(regional, region, description)
+            for region in config_entry.options[CONF_REGIONS]
+            for description in ECO2MIX_SENSOR_TYPES
+            if description.key not in NATIONAL_ONLY_KEYS
+        )
 
 
-class Eco2mixSensor(CoordinatorEntity[Eco2mixDataUpdateCoordinator], SensorEntity):
-    """Define an Eco2Mix sensor."""
+class Eco2mixEntity[CoordinatorT: DataUpdateCoordinator[Any]](
+    CoordinatorEntity[CoordinatorT], SensorEntity
+):
+    """Base class of the Eco2Mix sensors, writing their state only on change.
+
+    Most publications only change a few of the values, so the state is
+    compared at display precision with the last written one and the write
+    is skipped when it would not be visible.
+    """
 
     _attr_has_entity_name = True
+    _written_state: tuple[Any, ...] | None = None
+
+    def _state_key(self) -> tuple[Any, ...]:
+        """Return what the written state depends on."""
+        value = self.native_value if self.available else None
+        precision = self.entity_description.suggested_display_precision
+        if isinstance(value, float) and precision is not None:
+            value = round(value, precision)
+        return (self.available, value, self.extra_state_attributes)
+
+    async def async_added_to_hass(self) -> None:
+        """Remember the state written when added."""
+        await super().async_added_to_hass()
+        self._written_state = self._state_key()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state if it changed since the last write."""
+        stats = self.coordinator.write_stats
+        state = self._state_key()
+        if state == self._written_state:
+            stats.suppressed += 1
+            return
+        stats.emitted += 1
+        self._written_state = state
+        self.async_write_ha_state()
+
+
+class Eco2mixSensor(Eco2mixEntity[Eco2mixDataUpdateCoordinator]):
+    """Define an Eco2Mix sensor."""
+
     entity_description: Eco2mixSensorEntityDescription
 
     def __init__(
@@ -263,11 +556,149 @@ class Eco2mixSensor(CoordinatorEntity[Eco2mixDataUpdateCoordinator], SensorEntit
         self._attr_unique_id = f"eco2mix-{description.key}".lower()
         self.entity_description = description
 
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to the metric of the sensor before it is written."""
+        self.async_on_remove(
+            self.coordinator.async_subscribe_metrics({self.entity_description.key})
+        )
+        await super().async_added_to_hass()
+
+    @property
+    def available(self) -> bool:
+        """Return if the entity is available."""
+        return self.entity_description.always_available or super().available
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Skip the comparison when the value of the key didn't change."""
+        description = self.entity_description
+        if (
+            description.value_fn is None
+            and description.attr_fn is None
+            and description.key not in self.coordinator.changed_keys
+            and self._written_state is not None
+            and self._written_state[0] == self.available
+        ):
+            self.coordinator.write_stats.suppressed += 1
+            return
+        super()._handle_coordinator_update()
+
     @property
     def native_value(self) -> StateType:
         """Return the state of the sensor."""
+        if self.entity_description.value_fn is not None:
+            return self.entity_description.value_fn(self.coordinator)
         return self.coordinator.data[self.entity_description.key]
 
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the state attributes of the sensor."""
+        if self.entity_description.attr_fn is not None:
+            return self.entity_description.attr_fn(self.coordinator)
+        return None
+
+
+class Eco2mixForecastSensor(Eco2mixEntity[Eco2mixForecastCoordinator]):
+    """Define an Eco2Mix sensor of the consumption forecast.
+
+    The value depends on the current time as much as on the forecast, so
+    it is evaluated again at each quarter-hour, when a forecast interval
+    starts, and not only on the hourly forecast refresh.
+    """
+
+    entity_description: Eco2mixForecastSensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator: Eco2mixForecastCoordinator,
+        description: Eco2mixForecastSensorEntityDescription,
+    ) -> None:
+        """Initialize."""
+        super().__init__(coordinator)
+        self._attr_device_info = DeviceInfo(
+            entry_type=DeviceEntryType.SERVICE,
+            identifiers={(DOMAIN, "eco2mix_device")},
+        )
+        self._attr_unique_id = f"eco2mix-{description.key}".lower()
+        self.entity_description = description
+
+    async def async_added_to_hass(self) -> None:
+        """Evaluate the value again at each quarter-hour."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_track_time_change(
+                self.hass,
+                self._async_quarter_hour,
+                minute=(0, 15, 30, 45),
+                second=0,
+            )
+        )
+
+    @callback
+    def _async_quarter_hour(self, now: datetime) -> None:
+        """Write the state if it changed with the time."""
+        self._handle_coordinator_update()
+
+    @property
+    def native_value(self) -> StateType | datetime:
+        """Return the state of the sensor."""
+        return self.entity_description.value_fn(self.coordinator)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the state attributes of the sensor."""
+        if self.entity_description.attr_fn is not None:
+            return self.entity_description.attr_fn(self.coordinator)
+        return None
+
+
+class Eco2mixRegionalSensor(Eco2mixEntity[Eco2mixRegionalCoordinator]):
+    """Define an Eco2Mix sensor of a region."""
+
+    entity_description: Eco2mixSensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator: Eco2mixRegionalCoordinator,
+        region: str,
+        description: Eco2mixSensorEntityDescription,
+    ) -> None:
+        """Initialize."""
+        super().__init__(coordinator)
+        self._region = region
+        self._attr_device_info = DeviceInfo(
+            entry_type=DeviceEntryType.SERVICE,
+            identifiers={(DOMAIN, f"eco2mix_region_{region}")},
+            manufacturer="LFPoulain",
+            name=f"éCO2mix {REGIONS[region]}",
+            model="Integration Eco2Mix RTE via open data ODRE",
+            sw_version="1.0.0",
+            via_device=(DOMAIN, "eco2mix_device"),
+        )
+        self._attr_unique_id = f"eco2mix-{region}-{description.key}".lower()
+        self.entity_description = description
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to the metric of the sensor before it is written."""
+        self.async_on_remove(
+            self.coordinator.async_subscribe_metrics({self.entity_description.key})
+        )
+        await super().async_added_to_hass()
+
+    @property
+    def available(self) -> bool:
+        """Return if the region has data."""
+        return (
+            super().available
+            and self.coordinator.data is not None
+            and self._region in self.coordinator.data
+        )
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the state of the sensor."""
+        return self.coordinator.data[self._region].get(self.entity_description.key)
+
 
 class Eco2mixBaseSensor(CoordinatorEntity[Eco2mixDataUpdateCoordinator], SensorEntity):
     """Base class for éCO2mix sensors."""
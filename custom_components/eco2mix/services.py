@@ -0,0 +1,125 @@
+"""Services for the éCO2mix integration."""
+
+from datetime import timedelta
+from pathlib import Path
+
+import voluptuous as vol
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+
+from .const import (
+    DEFAULT_WINDOW_DURATION,
+    DEFAULT_WINDOW_HORIZON,
+    DOMAIN,
+    PUBLICATION_PERIOD,
+)
+from .api import Eco2mixApiError
+from .coordinator import Eco2mixDataUpdateCoordinator
+
+SERVICE_FIND_BEST_WINDOW = "find_best_window"
+SERVICE_EXPORT_HISTORY = "export_history"
+
+ATTR_DURATION = "duration"
+ATTR_HORIZON = "horizon"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_PATH = "path"
+
+FIND_BEST_WINDOW_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=DEFAULT_WINDOW_DURATION): vol.All(
+            cv.time_period, vol.Range(min=PUBLICATION_PERIOD)
+        ),
+        vol.Optional(ATTR_HORIZON, default=DEFAULT_WINDOW_HORIZON): vol.All(
+            cv.time_period, vol.Range(min=PUBLICATION_PERIOD, max=timedelta(days=1))
+        ),
+    }
+)
+
+EXPORT_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_START): cv.date,
+        vol.Required(ATTR_END): cv.date,
+        vol.Required(ATTR_PATH): cv.string,
+    }
+)
+
+
+def _get_coordinator(hass: HomeAssistant) -> Eco2mixDataUpdateCoordinator:
+    """Return the coordinator of the loaded config entry."""
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        if entry.state is ConfigEntryState.LOADED:
+            return entry.runtime_data.coordinator
+    raise ServiceValidationError(
+        translation_domain=DOMAIN, translation_key="not_loaded"
+    )
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the éCO2mix services."""
+
+    async def async_find_best_window(call: ServiceCall) -> ServiceResponse:
+        """Return the upcoming window with the lowest forecast consumption."""
+        coordinator = _get_coordinator(hass)
+        window = coordinator.best_window(
+            call.data[ATTR_DURATION], call.data[ATTR_HORIZON]
+        )
+        if window is None:
+            raise ServiceValidationError(
+                translation_domain=DOMAIN, translation_key="no_forecast"
+            )
+        start, end, average_consumption = window
+        return {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "average_consumption": average_consumption,
+        }
+
+    async def async_export_history(call: ServiceCall) -> ServiceResponse:
+        """Export the consolidated records of a range of days to a CSV file."""
+        coordinator = _get_coordinator(hass)
+        start, end = call.data[ATTR_START], call.data[ATTR_END]
+        if start >= end:
+            raise ServiceValidationError(
+                translation_domain=DOMAIN, translation_key="invalid_range"
+            )
+        path = Path(hass.config.path(call.data[ATTR_PATH]))
+        if not hass.config.is_allowed_path(str(path)):
+            raise ServiceValidationError(
+                translation_domain=DOMAIN,
+                translation_key="path_not_allowed",
+                translation_placeholders={"path": str(path)},
+            )
+        try:
+            return await coordinator.async_export_history(start, end, path)
+        except (Eco2mixApiError, OSError) as err:
+            raise HomeAssistantError(
+                translation_domain=DOMAIN,
+                translation_key="export_failed",
+                translation_placeholders={"error": str(err)},
+            ) from err
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_FIND_BEST_WINDOW,
+        async_find_best_window,
+        schema=FIND_BEST_WINDOW_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_HISTORY,
+        async_export_history,
+        schema=EXPORT_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
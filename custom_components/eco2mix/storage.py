@@ -0,0 +1,84 @@
+"""Persistence of the eco2mix data."""
+
+from datetime import UTC, datetime
+import math
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ALL_PRODUCTION_SOURCES,
+    STORAGE_KEY,
+    STORAGE_MINOR_VERSION,
+    STORAGE_VERSION,
+)
+from .processing import SOURCE_FIELDS
+
+
+def encode_record(record: dict[str, Any]) -> list[Any]:
+    """Encode a processed record as a compact list of values."""
+
+    def value(key: str) -> float | None:
+        value = record.get(key)
+        return None if value is None or math.isnan(value) else value
+
+    return [
+        int(record["timestamp"].timestamp()),
+        value("consumption"),
+        value("pumping"),
+        (value("import") or 0) - (value("export") or 0),
+        *(value(source) for source in ALL_PRODUCTION_SOURCES),
+    ]
+
+
+def decode_records(sources: list[str], rows: list[list[Any]]) -> list[dict[str, Any]]:
+    """Decode stored records into raw API records."""
+    records = []
+    for timestamp, consumption, pumping, exchanges, *values in rows:
+        record = {
+            "date_heure": datetime.fromtimestamp(timestamp, UTC).isoformat(),
+            "consommation": consumption,
+            "pompage": pumping,
+            "ech_physiques": exchanges,
+        }
+        for source, value in zip(sources, values, strict=True):
+            if source in SOURCE_FIELDS:
+                record[SOURCE_FIELDS[source]] = value
+        records.append(record)
+    return records
+
+
+class Eco2mixStore(Store[dict[str, Any]]):
+    """Store of the latest eco2mix record and the recent history.
+
+    The data holds the production sources layout, the latest record and
+    optionally the recent records, each record being a list of values:
+    epoch timestamp, consumption, pumping, exchanges, then the sources.
+    It also holds the state of the cumulated energy, since version 2.2.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize."""
+        super().__init__(
+            hass, STORAGE_VERSION, STORAGE_KEY, minor_version=STORAGE_MINOR_VERSION
+        )
+
+    async def _async_migrate_func(
+        self,
+        old_major_version: int,
+        old_minor_version: int,
+        old_data: dict[str, Any],
+    ) -> dict[str, Any]:
+        """Migrate the data saved by previous versions."""
+        if old_major_version == 1:
+            old_data["timestamp"] = dt_util.parse_datetime(old_data["timestamp"])
+            old_data = {
+                "sources": ALL_PRODUCTION_SOURCES,
+                "latest": encode_record(old_data),
+                "history": [],
+            }
+        if old_major_version == 1 or old_minor_version < 2:
+            old_data["energy"] = None
+        return old_data
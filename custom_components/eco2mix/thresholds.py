@@ -0,0 +1,62 @@
+"""Threshold crossings of the eco2mix metrics."""
+
+from dataclasses import dataclass
+from typing import Any
+
+# Processed keys which can be given a threshold
+THRESHOLD_KEYS = [
+    "renewable_percentage",
+    "low_carbon_percentage",
+    "carbon_intensity",
+]
+
+
+@dataclass
+class Threshold:
+    """Threshold of a processed key, with a hysteresis around it.
+
+    Like the threshold helper of Home Assistant, the value goes above the
+    threshold once it exceeds it by more than the hysteresis and back
+    below once it falls short of it by more than the hysteresis, so values
+    hovering around the threshold don't flap.
+    """
+
+    key: str
+    threshold: float
+    hysteresis: float = 0.0
+    # Whether the value is above the threshold, unknown until a value is seen
+    above: bool | None = None
+
+    @property
+    def threshold_id(self) -> str:
+        """Return the id of the threshold, unique among the thresholds."""
+        return f"{self.key}_{self.threshold:g}"
+
+    def update(self, value: float | None) -> bool:
+        """Update the state with a new value, return whether it crossed."""
+        if value is None:
+            return False
+        if value > self.threshold + self.hysteresis:
+            above = True
+        elif value < self.threshold - self.hysteresis:
+            above = False
+        elif self.above is None:
+            above = value > self.threshold
+        else:
+            return False
+
+        crossed = self.above is not None and above != self.above
+        self.above = above
+        return crossed
+
+
+def thresholds_from_options(options: dict[str, Any]) -> list[Threshold]:
+    """Return the thresholds set in the options of a config entry.
+
+    Each key has a list of thresholds, sharing the hysteresis of the key.
+    """
+    return [
+        Threshold(key, threshold, options.get(f"{key}_hysteresis", 0.0))
+        for key in THRESHOLD_KEYS
+        for threshold in sorted(set(options.get(key, [])))
+    ]